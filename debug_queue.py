@@ -1,118 +1,187 @@
 #!/usr/bin/env python3
 """Debug script to check queue status and database contents."""
 
+import argparse
 import asyncio
 import os
+import shutil
 import sys
 import sqlite3
 from datetime import datetime
 
+import orjson
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
 # Add src to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+sys.path.insert(0, os.path.join(BASE_DIR, 'src'))
 
 from config_manager import load_config
+from utils.db import open_db, close_db
+
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+def find_process_ids(pattern: str) -> list:
+    """Return PIDs whose command line contains ``pattern`` (like ``pgrep -f``).
+
+    Reads ``/proc`` directly instead of forking ``pgrep``. Raises
+    ``OSError`` when ``/proc`` is unavailable.
+    """
+    needle = pattern.encode()
+    own_pid = str(os.getpid())
+    pids = []
+    for entry in os.scandir('/proc'):
+        if not entry.name.isdigit() or entry.name == own_pid:
+            continue
+        try:
+            with open(f'/proc/{entry.name}/cmdline', 'rb') as f:
+                cmdline = f.read()
+        except OSError:
+            continue  # Process exited or is not readable
+        if needle in cmdline:
+            pids.append(entry.name)
+    return pids
+
+def collect_queue_stats(config) -> dict:
+    """Gather queue, disk and process statistics into a plain dict."""
+    stats = {
+        "db_path": config.db_path,
+        "download_dir": config.download_dir,
+        "db_exists": os.path.exists(config.db_path),
+    }
+    if not stats["db_exists"]:
+        return stats
+
+    conn = open_db(config.db_path)
+    try:
+        cursor = conn.cursor()
+
+        # Aggregate in SQLite instead of pulling every row into Python
+        cursor.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status")
+        status_counts = dict(cursor.fetchall())
+        stats["total"] = sum(status_counts.values())
+        stats["by_status"] = status_counts
+
+        cursor.execute(
+            "SELECT * FROM ("
+            "SELECT id, url, status, attempts, added_at, file_path, error_message "
+            "FROM tasks ORDER BY id DESC LIMIT 10"
+            ") ORDER BY id"
+        )
+        columns = ("id", "url", "status", "attempts", "added_at", "file_path", "error_message")
+        stats["recent"] = [dict(zip(columns, row)) for row in cursor]
+    finally:
+        close_db(conn)
 
-async def check_queue():
-    """Check the current state of the download queue."""
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    config = load_config(base_dir)
+    # Check if download directory exists and has space
+    if os.path.exists(config.download_dir):
+        stats["free_gb"] = shutil.disk_usage(config.download_dir).free / (1024**3)
+    else:
+        stats["free_gb"] = None
 
-    db_path = config.db_path
-    print(f"Database path: {db_path}")
-    print(f"Download directory: {config.download_dir}")
+    # Check for any running yt-dlp processes
+    try:
+        stats["ytdlp_pids"] = find_process_ids("yt-dlp")
+    except OSError:
+        stats["ytdlp_pids"] = None
+    return stats
+
+def print_queue_stats(stats: dict) -> None:
+    """Pretty-print the result of :func:`collect_queue_stats`."""
+    print(f"Database path: {stats['db_path']}")
+    print(f"Download directory: {stats['download_dir']}")
     print()
 
-    if not os.path.exists(db_path):
+    if not stats["db_exists"]:
         print("❌ Database file does not exist!")
         return
 
-    # Check database contents
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-
-    # Get all tasks
-    cursor.execute("SELECT id, url, status, attempts, added_at, updated_at, next_attempt_at, file_path, error_message FROM tasks ORDER BY id")
-    tasks = cursor.fetchall()
-
-    print(f"📊 Total tasks in database: {len(tasks)}")
+    print(f"📊 Total tasks in database: {stats['total']}")
     print()
 
-    # Group by status
-    status_counts = {}
-    for task in tasks:
-        status = task[2]
-        status_counts[status] = status_counts.get(status, 0) + 1
-
     print("📈 Tasks by status:")
-    for status, count in status_counts.items():
+    for status, count in stats["by_status"].items():
         print(f"  {status}: {count}")
     print()
 
     # Show recent tasks
-    print("📋 Recent tasks (last 10):")
-    for task in tasks[-10:]:
-        task_id, url, status, attempts, added_at, updated_at, next_attempt_at, file_path, error_message = task
-        added_time = datetime.fromtimestamp(added_at).strftime('%Y-%m-%d %H:%M:%S')
-        print(f"  ID {task_id}: {status} - {url[:50]}{'...' if len(url) > 50 else ''}")
-        print(f"    Added: {added_time}, Attempts: {attempts}")
-        if error_message:
-            print(f"    Error: {error_message}")
-        if file_path:
-            print(f"    File: {file_path}")
-        print()
-
-    # Check if download directory exists and has space
-    download_dir = config.download_dir
-    if os.path.exists(download_dir):
-        stat = os.statvfs(download_dir)
-        free_gb = (stat.f_bavail * stat.f_frsize) / (1024**3)
+    lines = ["📋 Recent tasks (last 10):"]
+    for task in stats["recent"]:
+        url = task["url"]
+        added_time = datetime.fromtimestamp(task["added_at"]).strftime(TIME_FORMAT)
+        lines.append(f"  ID {task['id']}: {task['status']} - {url[:50]}{'...' if len(url) > 50 else ''}")
+        lines.append(f"    Added: {added_time}, Attempts: {task['attempts']}")
+        if task["error_message"]:
+            lines.append(f"    Error: {task['error_message']}")
+        if task["file_path"]:
+            lines.append(f"    File: {task['file_path']}")
+        lines.append("")
+    sys.stdout.write("\n".join(lines) + "\n")
+
+    download_dir = stats["download_dir"]
+    if stats["free_gb"] is not None:
         print(f"💾 Download directory: {download_dir}")
-        print(f"Free space: {free_gb:.2f} GB")
+        print(f"Free space: {stats['free_gb']:.2f} GB")
     else:
         print(f"❌ Download directory does not exist: {download_dir}")
 
-    # Check for any running yt-dlp processes
-    import subprocess
-    try:
-        result = subprocess.run(['pgrep', '-f', 'yt-dlp'], capture_output=True, text=True)
-        if result.returncode == 0:
-            pids = result.stdout.strip().split('\n')
-            print(f"🎬 Running yt-dlp processes: {len(pids)}")
-            for pid in pids[:5]:  # Show first 5
-                print(f"  PID: {pid}")
-        else:
-            print("🎬 No running yt-dlp processes")
-    except:
+    pids = stats["ytdlp_pids"]
+    if pids is None:
         print("⚠️ Could not check for running yt-dlp processes")
+    elif pids:
+        print(f"🎬 Running yt-dlp processes: {len(pids)}")
+        for pid in pids[:5]:  # Show first 5
+            print(f"  PID: {pid}")
+    else:
+        print("🎬 No running yt-dlp processes")
 
     # Option to clear failed tasks
-    if len([t for t in tasks if t[2] == 'failed']) > 0:
+    if stats["by_status"].get('failed', 0) > 0:
         print()
         print("💡 To clear failed tasks, you can run:")
         print("python3 -c \"import asyncio; from debug_queue import clear_failed_tasks; asyncio.run(clear_failed_tasks())\"")
 
-    conn.close()
+async def check_queue(as_json: bool = False):
+    """Check the current state of the download queue.
+
+    With ``as_json`` the statistics are written as a single JSON object
+    for monitoring scripts instead of the human-readable report.
+    """
+    config = load_config(BASE_DIR)
+
+    stats = collect_queue_stats(config)
+    if as_json:
+        sys.stdout.write(orjson.dumps(stats).decode() + "\n")
+    else:
+        print_queue_stats(stats)
 
 async def clear_failed_tasks():
     """Clear all failed tasks from the database."""
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    config = load_config(base_dir)
+    config = load_config(BASE_DIR)
 
     db_path = config.db_path
-    conn = sqlite3.connect(db_path)
+    conn = open_db(db_path)
     cursor = conn.cursor()
 
-    # Count failed tasks before deletion
-    cursor.execute("SELECT COUNT(*) FROM tasks WHERE status='failed'")
-    count_before = cursor.fetchone()[0]
+    if sqlite3.sqlite_version_info >= (3, 35, 0):
+        # Delete and count in a single statement
+        cursor.execute("DELETE FROM tasks WHERE status='failed' RETURNING id")
+        count_before = len(cursor.fetchall())
+    else:
+        # Count failed tasks before deletion
+        cursor.execute("SELECT COUNT(*) FROM tasks WHERE status='failed'")
+        count_before = cursor.fetchone()[0]
 
-    # Delete failed tasks
-    cursor.execute("DELETE FROM tasks WHERE status='failed'")
+        # Delete failed tasks
+        cursor.execute("DELETE FROM tasks WHERE status='failed'")
     conn.commit()
 
     print(f"🗑️ Cleared {count_before} failed tasks from the database")
 
-    conn.close()
+    close_db(conn)
 
 if __name__ == "__main__":
-    asyncio.run(check_queue())
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--json", action="store_true", help="emit machine-readable JSON")
+    args = parser.parse_args()
+    asyncio.run(check_queue(as_json=args.json))
@@ -2,17 +2,22 @@
 
 from __future__ import annotations
 
-import uuid
-from typing import Optional
+import itertools
+from typing import List, Optional
 
-import requests
+import httpx
+import orjson
 
 from .utils.logger import get_logger
 
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
 
 class Aria2Manager:
     """Minimal aria2c JSON-RPC client for magnet submissions."""
 
+    logger = get_logger("Aria2Manager")
+
     def __init__(
         self,
         rpc_url: str,
@@ -24,39 +29,88 @@ class Aria2Manager:
         self.secret = secret.strip() if secret else ""
         self.timeout = timeout
         self.download_dir = download_dir
-        self.logger = get_logger(self.__class__.__name__)
+        # Created on first use; keep-alive lets repeated submissions reuse the connection
+        self._async_client: Optional[httpx.AsyncClient] = None
+        # JSON-RPC ids only need to be unique per client
+        self._request_ids = itertools.count(1)
 
-    def add_magnet(self, magnet_link: str) -> str:
-        """Send a magnet link to aria2 via JSON-RPC."""
-        if not self.rpc_url:
-            raise RuntimeError("aria2 RPC URL is not configured.")
-        payload: dict = {
-            "jsonrpc": "2.0",
-            "id": str(uuid.uuid4()),
-            "method": "aria2.addUri",
-            "params": [],
-        }
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client."""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
 
+    def _add_uri_params(self, magnet_link: str) -> list:
+        """Build the ``aria2.addUri`` parameter list for one link."""
+        params: list = []
         if self.secret:
-            payload["params"].append(f"token:{self.secret}")
-        payload["params"].append([magnet_link])
+            params.append(f"token:{self.secret}")
+        params.append([magnet_link])
         options = {}
         if self.download_dir:
             options["dir"] = self.download_dir
         if options:
-            payload["params"].append(options)
+            params.append(options)
+        return params
+
+    async def add_magnet(self, magnet_link: str) -> str:
+        """Send one magnet link to aria2 and return its GID."""
+        gids = await self.add_magnets([magnet_link])
+        return gids[0] if gids else ""
 
+    async def add_magnets(self, magnet_links: List[str]) -> List[str]:
+        """Submit several magnet links in one ``system.multicall`` request.
+
+        Returns the aria2 GIDs in the same order as ``magnet_links``. If
+        aria2 rejects any entry a ``RuntimeError`` is raised after the
+        accepted entries have been logged.
+        """
+        if not self.rpc_url:
+            raise RuntimeError("aria2 RPC URL is not configured.")
+        if not magnet_links:
+            return []
+        calls = [
+            {"methodName": "aria2.addUri", "params": self._add_uri_params(link)}
+            for link in magnet_links
+        ]
+        payload: dict = {
+            "jsonrpc": "2.0",
+            "id": str(next(self._request_ids)),
+            "method": "system.multicall",
+            "params": [calls],
+        }
+
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=8, max_keepalive_connections=4),
+            )
         try:
-            response = requests.post(self.rpc_url, json=payload, timeout=self.timeout)
+            response = await self._async_client.post(
+                self.rpc_url, content=orjson.dumps(payload), headers=_JSON_HEADERS
+            )
             response.raise_for_status()
-            data = response.json()
-            if "error" in data:
-                error = data["error"].get("message", str(data["error"]))
-                self.logger.error("aria2 returned error: %s", error)
-                raise RuntimeError(f"aria2 RPC error: {error}")
-            gid = data.get("result")
-            self.logger.info("Submitted magnet to aria2: gid=%s", gid)
-            return gid or ""
-        except requests.RequestException as exc:
-            self.logger.error("Failed to submit magnet to aria2: %s", exc)
+            data = orjson.loads(response.content)
+        except (httpx.HTTPError, orjson.JSONDecodeError) as exc:
+            self.logger.error("Failed to submit magnets to aria2: %s", exc)
             raise RuntimeError(f"aria2 RPC request failed: {exc}") from exc
+        if "error" in data:
+            error = data["error"].get("message", str(data["error"]))
+            self.logger.error("aria2 returned error: %s", error)
+            raise RuntimeError(f"aria2 RPC error: {error}")
+
+        # Each result is either [gid] on success or a fault struct
+        gids: List[str] = []
+        errors: List[str] = []
+        for result in data.get("result") or []:
+            if isinstance(result, list) and result:
+                gids.append(result[0] or "")
+            else:
+                fault = result.get("message", str(result)) if isinstance(result, dict) else str(result)
+                errors.append(fault)
+        if gids:
+            self.logger.info("Submitted %d magnet(s) to aria2: gids=%s", len(gids), ", ".join(gids))
+        if errors:
+            self.logger.error("aria2 rejected %d magnet(s): %s", len(errors), "; ".join(errors))
+            raise RuntimeError(f"aria2 RPC error: {errors[0]}")
+        return gids
@@ -11,20 +11,23 @@ import asyncio
 import os
 import sys
 
-from telegram.ext import Application, CommandHandler, MessageHandler, filters
-
-from .aria2_manager import Aria2Manager
 from .config_manager import load_config
-from .feed_manager import FeedManager
-from .utils.disk_monitor import ConcurrencyGovernor
 from .utils.logger import setup_logging, get_logger
-from .queue_manager import QueueManager
-from .download_manager import DownloadManager
-from .handlers import command_handler, message_handler
 
 
 def main() -> None:
     """Main entrypoint for the bot."""
+    # Heavy modules (telegram, aiohttp, yt-dlp, feedparser) are imported
+    # here so importing this module stays cheap.
+    from telegram.ext import Application, CommandHandler, MessageHandler, filters
+
+    from .aria2_manager import Aria2Manager
+    from .feed_manager import FeedManager
+    from .utils.disk_monitor import ConcurrencyGovernor
+    from .queue_manager import QueueManager
+    from .download_manager import DownloadManager
+    from .handlers import command_handler, message_handler
+
     # Determine base directory relative to this file
     base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -57,8 +60,17 @@ def main() -> None:
         await download_manager.start()
         logger.info("Download manager started")
 
+    async def post_shutdown(app):
+        """Stop background work, then release long-lived clients."""
+        # Workers and feed polling use the queue, so they stop before it closes
+        await download_manager.stop()
+        await feed_manager.stop()
+        if aria2_manager:
+            await aria2_manager.aclose()
+        await queue_manager.close()
+
     # Build the Telegram application
-    application = Application.builder().token(config.token).concurrent_updates(True).post_init(post_init).build()
+    application = Application.builder().token(config.token).concurrent_updates(True).post_init(post_init).post_shutdown(post_shutdown).build()
 
     # Store config for handlers
     application.bot_data["config"] = config
@@ -1,9 +1,29 @@
+import functools
 import os
-from dotenv import load_dotenv
-from typing import List
+import re
+from pathlib import Path
+from typing import FrozenSet, List, Union
 
-env_path = os.path.join(os.path.dirname(__file__), '..', '.env')
-load_dotenv(dotenv_path=os.path.abspath(env_path), override=True)
+try:
+    from dotenv import load_dotenv
+except ImportError:  # python-dotenv is optional when env vars are already set
+    load_dotenv = None
+
+# Resolved once at import; Config and load_config default to this directory
+_BASE_DIR = Path(__file__).resolve().parent.parent
+env_path = _BASE_DIR / ".env"
+_env_loaded = False
+
+
+def _load_env() -> None:
+    """Load the project's .env file once per process."""
+    global _env_loaded
+    if _env_loaded:
+        return
+    _env_loaded = True
+    if load_dotenv is None or not env_path.exists():
+        return
+    load_dotenv(dotenv_path=env_path, override=True)
 
 
 class ConfigurationError(Exception):
@@ -11,11 +31,53 @@ class ConfigurationError(Exception):
     pass
 
 
+_ALLOWED_LOG_LEVELS = frozenset({"DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"})
+_ALLOWED_FORMATS = frozenset({"mp4", "webm", "mkv", "flv", "avi"})
+_QUALITY_RE = re.compile(r"^\d+p$")
+
+# (attribute, environment variable, type, default, check, error message)
+# Entries are parsed in order, so a check may refer to attributes set by
+# earlier entries (MIN_CONCURRENT is bounded by MAX_CONCURRENT).
+_NUMERIC_SETTINGS = (
+    ("max_concurrent", "MAX_CONCURRENT", int, "8",
+     lambda v, c: 1 <= v <= 100, "MAX_CONCURRENT must be between 1 and 100"),
+    ("min_concurrent", "MIN_CONCURRENT", int, "2",
+     lambda v, c: 1 <= v <= c.max_concurrent, "MIN_CONCURRENT must be between 1 and MAX_CONCURRENT"),
+    ("concurrency_cpu_threshold", "CONCURRENCY_CPU_THRESHOLD", float, "85.0",
+     lambda v, c: 0 < v <= 100, "CONCURRENCY_CPU_THRESHOLD must be between 0 and 100"),
+    ("concurrency_disk_threshold", "CONCURRENCY_DISK_THRESHOLD", float, "90.0",
+     lambda v, c: 0 < v <= 100, "CONCURRENCY_DISK_THRESHOLD must be between 0 and 100"),
+    ("aria2_rpc_timeout", "ARIA2_RPC_TIMEOUT", float, "30",
+     lambda v, c: v > 0, "ARIA2_RPC_TIMEOUT must be positive"),
+    ("min_disk_space_gb", "MIN_DISK_SPACE_GB", float, "50.0",
+     lambda v, c: v >= 0, "MIN_DISK_SPACE_GB cannot be negative"),
+    ("socket_timeout", "SOCKET_TIMEOUT", int, "30",
+     lambda v, c: v >= 1, "SOCKET_TIMEOUT must be at least 1"),
+    ("max_retries", "MAX_RETRIES", int, "5",
+     lambda v, c: v >= 0, "MAX_RETRIES cannot be negative"),
+    ("retry_sleep", "RETRY_SLEEP", int, "1",
+     lambda v, c: v >= 0, "RETRY_SLEEP cannot be negative"),
+    ("max_playlist_videos", "MAX_PLAYLIST_VIDEOS", int, "10",
+     lambda v, c: v >= 1, "MAX_PLAYLIST_VIDEOS must be at least 1"),
+    ("feed_poll_interval", "FEED_POLL_INTERVAL", int, "300",
+     lambda v, c: v >= 60, "FEED_POLL_INTERVAL must be at least 60 seconds"),
+    ("feed_max_items_per_poll", "FEED_MAX_ITEMS_PER_POLL", int, "5",
+     lambda v, c: v >= 1, "FEED_MAX_ITEMS_PER_POLL must be at least 1"),
+    ("feed_fetch_timeout", "FEED_FETCH_TIMEOUT", float, "20.0",
+     lambda v, c: v > 0, "FEED_FETCH_TIMEOUT must be positive"),
+)
+
+
 class Config:
     """Configuration object for the AutoDL bot."""
 
-    def __init__(self, base_dir: str):
-        """Initialize configuration from environment variables."""
+    def __init__(self, base_dir: Union[str, Path, None] = None):
+        """Initialize configuration from environment variables.
+
+        ``base_dir`` defaults to the project root; data paths are derived
+        from it and exposed as plain strings.
+        """
+        data_dir = (Path(base_dir) if base_dir is not None else _BASE_DIR) / "data"
         token = os.getenv("TELEGRAM_BOT_TOKEN")
         if not token or not token.strip():
             raise ConfigurationError("TELEGRAM_BOT_TOKEN must be set in .env and cannot be empty")
@@ -25,6 +87,8 @@ class Config:
         admin_ids_str = os.getenv("TELEGRAM_ADMIN_IDS", "")
         if admin_ids_str and admin_ids_str.strip():
             self.admin_ids = [aid.strip() for aid in admin_ids_str.split(",") if aid.strip()]
+        # Set form for authorization checks; empty means every user is allowed
+        self.admin_id_set: FrozenSet[str] = frozenset(self.admin_ids)
 
         download_dir = os.getenv("DOWNLOAD_DIR", "/mnt/sda/videos")
         if not download_dir or not download_dir.strip():
@@ -32,123 +96,49 @@ class Config:
         self.download_dir = download_dir.strip()
 
         log_level = os.getenv("LOG_LEVEL", "INFO").strip().upper()
-        if log_level not in {"DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"}:
+        if log_level not in _ALLOWED_LOG_LEVELS:
             raise ConfigurationError(f"LOG_LEVEL must be one of DEBUG, INFO, WARNING, ERROR, CRITICAL (got: {log_level})")
         self.log_level = log_level
 
-        try:
-            self.max_concurrent = int(os.getenv("MAX_CONCURRENT", "8"))
-            if self.max_concurrent < 1 or self.max_concurrent > 100:
-                raise ValueError("MAX_CONCURRENT must be between 1 and 100")
-        except ValueError as e:
-            raise ConfigurationError(f"Invalid MAX_CONCURRENT value: {e}")
-
-        try:
-            self.min_concurrent = int(os.getenv("MIN_CONCURRENT", "2"))
-            if self.min_concurrent < 1 or self.min_concurrent > self.max_concurrent:
-                raise ValueError("MIN_CONCURRENT must be between 1 and MAX_CONCURRENT")
-        except ValueError as e:
-            raise ConfigurationError(f"Invalid MIN_CONCURRENT value: {e}")
-
-        try:
-            self.concurrency_cpu_threshold = float(os.getenv("CONCURRENCY_CPU_THRESHOLD", "85.0"))
-            if self.concurrency_cpu_threshold <= 0 or self.concurrency_cpu_threshold > 100:
-                raise ValueError("CONCURRENCY_CPU_THRESHOLD must be between 0 and 100")
-        except ValueError as e:
-            raise ConfigurationError(f"Invalid CONCURRENCY_CPU_THRESHOLD value: {e}")
-
-        try:
-            self.concurrency_disk_threshold = float(os.getenv("CONCURRENCY_DISK_THRESHOLD", "90.0"))
-            if self.concurrency_disk_threshold <= 0 or self.concurrency_disk_threshold > 100:
-                raise ValueError("CONCURRENCY_DISK_THRESHOLD must be between 0 and 100")
-        except ValueError as e:
-            raise ConfigurationError(f"Invalid CONCURRENCY_DISK_THRESHOLD value: {e}")
+        for attr, env_name, cast, default, check, message in _NUMERIC_SETTINGS:
+            try:
+                value = cast(os.getenv(env_name, default))
+                if not check(value, self):
+                    raise ValueError(message)
+            except ValueError as e:
+                raise ConfigurationError(f"Invalid {env_name} value: {e}")
+            setattr(self, attr, value)
 
         cookies_file_env = os.getenv("COOKIES_FILE")
-        self.cookies_file = cookies_file_env.strip() if cookies_file_env and cookies_file_env.strip() else os.path.join(base_dir, "data", "cookies", "cookies.txt")
+        self.cookies_file = cookies_file_env.strip() if cookies_file_env and cookies_file_env.strip() else str(data_dir / "cookies" / "cookies.txt")
+        self.cookies_path = Path(self.cookies_file)
 
         self.use_aria2c = os.getenv("USE_ARIA2C", "true").lower() == "true"
         self.aria2_rpc_url = os.getenv("ARIA2_RPC_URL", "").strip()
         self.aria2_rpc_secret = os.getenv("ARIA2_RPC_SECRET", "").strip()
-        try:
-            self.aria2_rpc_timeout = float(os.getenv("ARIA2_RPC_TIMEOUT", "30"))
-            if self.aria2_rpc_timeout <= 0:
-                raise ValueError("ARIA2_RPC_TIMEOUT must be positive")
-        except ValueError as e:
-            raise ConfigurationError(f"Invalid ARIA2_RPC_TIMEOUT value: {e}")
-
-        try:
-            self.min_disk_space_gb = float(os.getenv("MIN_DISK_SPACE_GB", "50.0"))
-            if self.min_disk_space_gb < 0:
-                raise ValueError("MIN_DISK_SPACE_GB cannot be negative")
-        except ValueError as e:
-            raise ConfigurationError(f"Invalid MIN_DISK_SPACE_GB value: {e}")
-
-        try:
-            self.socket_timeout = int(os.getenv("SOCKET_TIMEOUT", "30"))
-            if self.socket_timeout < 1:
-                raise ValueError("SOCKET_TIMEOUT must be at least 1")
-        except ValueError as e:
-            raise ConfigurationError(f"Invalid SOCKET_TIMEOUT value: {e}")
-
-        try:
-            self.max_retries = int(os.getenv("MAX_RETRIES", "5"))
-            if self.max_retries < 0:
-                raise ValueError("MAX_RETRIES cannot be negative")
-        except ValueError as e:
-            raise ConfigurationError(f"Invalid MAX_RETRIES value: {e}")
-
-        try:
-            self.retry_sleep = int(os.getenv("RETRY_SLEEP", "1"))
-            if self.retry_sleep < 0:
-                raise ValueError("RETRY_SLEEP cannot be negative")
-        except ValueError as e:
-            raise ConfigurationError(f"Invalid RETRY_SLEEP value: {e}")
 
         max_video_quality = os.getenv("MAX_VIDEO_QUALITY", "1080p").strip()
-        if not max_video_quality.endswith('p') or not max_video_quality[:-1].isdigit():
+        if not _QUALITY_RE.match(max_video_quality):
             raise ConfigurationError(f"MAX_VIDEO_QUALITY must be in format XXXp (e.g., 1080p), got: {max_video_quality}")
         self.max_video_quality = max_video_quality
 
         preferred_format = os.getenv("PREFERRED_FORMAT", "mp4").strip().lower()
-        if preferred_format not in {"mp4", "webm", "mkv", "flv", "avi"}:
+        if preferred_format not in _ALLOWED_FORMATS:
             raise ConfigurationError(f"PREFERRED_FORMAT must be one of mp4, webm, mkv, flv, avi (got: {preferred_format})")
         self.preferred_format = preferred_format
 
         self.skip_hls = os.getenv("SKIP_HLS", "true").lower() == "true"
         self.skip_dash = os.getenv("SKIP_DASH", "true").lower() == "true"
 
-        try:
-            self.max_playlist_videos = int(os.getenv("MAX_PLAYLIST_VIDEOS", "10"))
-            if self.max_playlist_videos < 1:
-                raise ValueError("MAX_PLAYLIST_VIDEOS must be at least 1")
-        except ValueError as e:
-            raise ConfigurationError(f"Invalid MAX_PLAYLIST_VIDEOS value: {e}")
-
-        try:
-            self.feed_poll_interval = int(os.getenv("FEED_POLL_INTERVAL", "300"))
-            if self.feed_poll_interval < 60:
-                raise ValueError("FEED_POLL_INTERVAL must be at least 60 seconds")
-        except ValueError as e:
-            raise ConfigurationError(f"Invalid FEED_POLL_INTERVAL value: {e}")
-
-        try:
-            self.feed_max_items_per_poll = int(os.getenv("FEED_MAX_ITEMS_PER_POLL", "5"))
-            if self.feed_max_items_per_poll < 1:
-                raise ValueError("FEED_MAX_ITEMS_PER_POLL must be at least 1")
-        except ValueError as e:
-            raise ConfigurationError(f"Invalid FEED_MAX_ITEMS_PER_POLL value: {e}")
-
-        try:
-            self.feed_fetch_timeout = float(os.getenv("FEED_FETCH_TIMEOUT", "20.0"))
-            if self.feed_fetch_timeout <= 0:
-                raise ValueError("FEED_FETCH_TIMEOUT must be positive")
-        except ValueError as e:
-            raise ConfigurationError(f"Invalid FEED_FETCH_TIMEOUT value: {e}")
-
-        self.db_path = os.path.join(base_dir, "data", "queue", "autodl.db")
-
-
-def load_config(base_dir: str):
-    """Load configuration from environment variables."""
+        self.db_path = str(data_dir / "queue" / "autodl.db")
+
+
+@functools.lru_cache(maxsize=None)
+def load_config(base_dir: Union[str, Path, None] = None):
+    """Load configuration from environment variables.
+
+    The parsed configuration is cached per ``base_dir``; construct
+    :class:`Config` directly to force a fresh read of the environment.
+    """
+    _load_env()
     return Config(base_dir)
@@ -12,11 +12,15 @@ from __future__ import annotations
 import asyncio
 import os
 import re
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from itertools import islice
 from typing import Dict, Optional
 from urllib.parse import urlparse
 
-import requests
+import aiohttp
 from yt_dlp import YoutubeDL
 
 from .aria2_manager import Aria2Manager
@@ -26,76 +30,97 @@ from .utils.disk_monitor import ConcurrencyGovernor
 from .utils.logger import get_logger
 from .utils.validators import sanitize_url
 
+logger = get_logger(__name__)
+
+# Seconds a finished task stays visible in the active status listing
+STATUS_LINGER_SECONDS = 2.0
+
+# Write size for plain HTTP file downloads
+FILE_CHUNK_SIZE = 1024 * 1024
+# Written data is dropped from the page cache in windows of this size
+FADVISE_WINDOW = 16 * 1024 * 1024
+_HAS_FADVISE = hasattr(os, "posix_fadvise")
+
+# "playlist?list=" and "/playlist/" are covered by the shorter alternatives
+_PLAYLIST_RE = re.compile(r"playlist|list=|album|channel|user", re.IGNORECASE)
+_DISPOSITION_FILENAME_RE = re.compile(r'filename\*?=(?:UTF-8\'\')?"?([^";]+)"?')
+
 
 def is_playlist_url(url: str) -> bool:
     """Check if URL is a playlist."""
-    playlist_keywords = [
-        'playlist', 'list=', 'playlist?list=', '/playlist/',
-        'album', 'channel', 'user'
-    ]
-    url_lower = url.lower()
-    return any(keyword in url_lower for keyword in playlist_keywords)
+    return _PLAYLIST_RE.search(url) is not None
+
+
+# yt-dlp instances for flat playlist extraction. Building a YoutubeDL
+# registers every extractor, so each executor thread keeps and reuses its own
+# (instances are not safe to share between concurrent extractions).
+_FLAT_YDL_OPTS = {
+    "quiet": True,
+    "no_warnings": True,
+    "extract_flat": True,  # Don't download, just extract URLs
+    "age_limit": 99,  # Allow adult content
+    "ignoreerrors": True,  # Continue on errors
+    "lazy_playlist": True,  # Fetch playlist pages only until playlistend is reached
+}
+_flat_ydl_local = threading.local()
+# Flat extractions block on network I/O for seconds; a dedicated pool keeps
+# them from starving the loop's default executor and caps how many
+# thread-local YoutubeDL instances are ever built.
+_EXTRACTOR_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="ytdl")
+
+
+def _extract_flat_info(url: str, limit: int) -> Optional[dict]:
+    """Run a flat ``extract_info`` on this thread's YoutubeDL instance."""
+    ydl = getattr(_flat_ydl_local, "ydl", None)
+    if ydl is None:
+        ydl = _flat_ydl_local.ydl = YoutubeDL(dict(_FLAT_YDL_OPTS))
+    ydl.params["playlistend"] = limit
+    return ydl.extract_info(url, download=False)
 
 
 async def extract_playlist_urls(url: str, max_videos: int = None) -> list[str]:
     """Extract individual video URLs from a playlist URL."""
     url = sanitize_url(url)
+    limit = max_videos or 10  # Always limit playlists
     try:
-        # Use yt-dlp to extract playlist info without downloading
-        ydl_opts = {
-            "quiet": True,
-            "no_warnings": True,
-            "extract_flat": True,  # Don't download, just extract URLs
-            "age_limit": 99,  # Allow adult content
-            "ignoreerrors": True,  # Continue on errors
-            "playlistend": max_videos or 10,  # Always limit playlists
-            "max_downloads": max_videos or 10,  # Additional limit
-        }
+        logger.debug("Extracting playlist info for %s with max_videos=%s", url, max_videos)
+        loop = asyncio.get_running_loop()
+        info = await loop.run_in_executor(_EXTRACTOR_POOL, _extract_flat_info, url, limit)
 
-        from yt_dlp import YoutubeDL
-        with YoutubeDL(ydl_opts) as ydl:
-            print(f"DEBUG: Extracting playlist info for {url} with max_videos={max_videos}")
-            info = ydl.extract_info(url, download=False)
-
-            if not info:
-                print("DEBUG: No info returned from yt-dlp")
-                return []
-
-            # Handle different playlist structures
-            if 'entries' in info:
-                # Standard playlist
-                entries = info['entries']
-                print(f"DEBUG: Found {len(entries)} entries in playlist")
-            elif isinstance(info, list):
-                # Some extractors return list directly
-                entries = info
-                print(f"DEBUG: Info is list with {len(entries)} items")
-            else:
-                print(f"DEBUG: Unexpected info structure: {type(info)}")
-                return []
-
-            # Extract URLs from entries
-            video_urls = []
-            for i, entry in enumerate(entries):
-                if isinstance(entry, dict):
-                    video_url = entry.get('url') or entry.get('webpage_url')
-                    if video_url:
-                        video_urls.append(video_url)
-                        print(f"DEBUG: Extracted URL {i+1}: {video_url[:60]}...")
-                    else:
-                        print(f"DEBUG: No URL found in entry {i+1}")
-                elif isinstance(entry, str):
-                    video_urls.append(entry)
-                    print(f"DEBUG: String URL {i+1}: {entry[:60]}...")
+        if not info:
+            logger.debug("No info returned from yt-dlp for %s", url)
+            return []
+
+        # Standard playlists carry 'entries'; some extractors return a list directly
+        if isinstance(info, list):
+            entries = info
+        elif 'entries' in info:
+            entries = info['entries'] or []
+        else:
+            logger.debug("Unexpected info structure for %s: %s", url, type(info))
+            return []
+
+        # Entries may be a lazy generator; stop consuming once the limit is reached
+        video_urls = []
+        for i, entry in enumerate(islice(entries, limit)):
+            if isinstance(entry, dict):
+                video_url = entry.get('url') or entry.get('webpage_url')
+                if video_url:
+                    video_urls.append(video_url)
                 else:
-                    print(f"DEBUG: Unexpected entry type {i+1}: {type(entry)}")
+                    logger.debug("No URL found in playlist entry %d", i + 1)
+            elif isinstance(entry, str):
+                video_urls.append(entry)
+            else:
+                logger.debug("Unexpected playlist entry type %d: %s", i + 1, type(entry))
 
-            limited_urls = video_urls[:max_videos] if max_videos else video_urls
-            print(f"DEBUG: Returning {len(limited_urls)} URLs (limited from {len(video_urls)})")
-            return limited_urls
+        # Some extractors list the same video more than once
+        video_urls = list(dict.fromkeys(video_urls))
+        logger.debug("Returning %d URLs", len(video_urls))
+        return video_urls
 
     except Exception as e:
-        print(f"Error extracting playlist URLs: {e}")
+        logger.error("Error extracting playlist URLs: %s", e)
         return []
 
 
@@ -122,24 +147,78 @@ class DownloadManager:
         self.config = config
         self.logger = get_logger(self.__class__.__name__)
         self.active_tasks: Dict[int, Dict[str, str]] = {}
-        self.paused: bool = False
+        # Set while downloads may run; workers block on it while paused
+        self._resume_event = asyncio.Event()
+        self._resume_event.set()
         self._workers: list[asyncio.Task] = []
         self._stop_event = asyncio.Event()
-        self._slot_lock = asyncio.Lock()
-        self._active_downloads = 0
+        # Download slots: one token per allowed concurrent download
+        self._slot_sem = asyncio.Semaphore(config.max_concurrent)
         self._target_worker_limit = config.max_concurrent
+        # Slots still to be withdrawn after a limit decrease; consumed on release
+        self._pending_shrink = 0
         self._governor_sync_task: Optional[asyncio.Task] = None
+        # Shared HTTP session for plain file downloads; created on first use
+        self._http: Optional[aiohttp.ClientSession] = None
         self.aria2_manager = aria2_manager
         self.governor = concurrency_governor
+        self._base_ydl_opts = self._build_base_ydl_opts()
+
+    def _build_base_ydl_opts(self) -> dict:
+        """Return the yt-dlp options shared by every download.
+
+        Built once: none of these settings change while the bot runs. Hooks
+        are added per task in ``_download_with_ytdlp``.
+        """
+        ydl_opts = {
+            "outtmpl": os.path.join(self.config.download_dir, "%(title)s.%(ext)s"),
+            "format": "bestvideo+bestaudio/best",
+            "ignoreerrors": True,
+            "noplaylist": True,
+            "quiet": True,
+            "no_warnings": True,
+            "socket_timeout": self.config.socket_timeout,
+            "merge_output_format": self.config.preferred_format,
+            "writethumbnail": True,
+            "writedescription": True,
+            "writesubtitles": True,
+            "cachedir": False,
+            "concurrent_fragment_downloads": 16,
+            "external_downloader_args": [
+                "--continue=true",
+                "--max-tries=5",
+            ],
+        }
+        if self.config.use_aria2c and self.config.aria2_rpc_url:
+            ydl_opts["external_downloader"] = "aria2c"
+            ydl_opts["external_downloader_args"].extend([
+                "--file-allocation=none",
+                "--allow-overwrite=true",
+            ])
+        if self.config.cookies_file:
+            ydl_opts["cookiefile"] = self.config.cookies_file
+        return ydl_opts
+
+    @property
+    def paused(self) -> bool:
+        """Whether workers are held back from starting new tasks."""
+        return not self._resume_event.is_set()
+
+    @paused.setter
+    def paused(self, value: bool) -> None:
+        if value:
+            self._resume_event.clear()
+        else:
+            self._resume_event.set()
 
     async def start(self) -> None:
         """Start worker tasks up to the configured concurrency limit."""
         # Reset stop flag
         self._stop_event.clear()
         if self.governor:
-            self._target_worker_limit = self.governor.target_workers
+            await self.set_worker_limit(self.governor.target_workers)
         else:
-            self._target_worker_limit = self.config.max_concurrent
+            await self.set_worker_limit(self.config.max_concurrent)
         self.logger.info(
             "Starting download manager (worker limit: %d)", self._target_worker_limit
         )
@@ -163,17 +242,19 @@ class DownloadManager:
             self._governor_sync_task = None
         if self.governor:
             await self.governor.stop()
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
 
     async def _worker_loop(self) -> None:
         """Continuously fetch and process tasks until stopped."""
         while not self._stop_event.is_set():
             if self.paused:
-                await asyncio.sleep(2)
+                await self._resume_event.wait()
                 continue
             if disk_monitor.is_low_disk(self.config.download_dir, self.config.min_disk_space_gb):
                 self.logger.warning("Low disk space detected. Pausing downloads until space is freed.")
                 self.paused = True
-                await asyncio.sleep(2)
                 continue
             slot_acquired = await self._wait_for_slot()
             if not slot_acquired:
@@ -191,35 +272,59 @@ class DownloadManager:
 
     async def _wait_for_slot(self) -> bool:
         """Wait until a download slot is available based on governor/limits."""
-        while not self._stop_event.is_set():
-            async with self._slot_lock:
-                if self._active_downloads < max(1, self._target_worker_limit):
-                    self._active_downloads += 1
-                    return True
-            await asyncio.sleep(0.5)
-        return False
+        if self._stop_event.is_set():
+            return False
+        await self._slot_sem.acquire()
+        return True
 
     async def _release_slot(self) -> None:
         """Release a previously acquired download slot."""
-        async with self._slot_lock:
-            self._active_downloads = max(0, self._active_downloads - 1)
+        if self._pending_shrink > 0:
+            # Limit was lowered while this slot was busy; retire it
+            self._pending_shrink -= 1
+        else:
+            self._slot_sem.release()
+
+    async def set_worker_limit(self, limit: int) -> None:
+        """Resize the number of download slots to ``limit`` (at least 1).
+
+        Growing releases extra tokens immediately. Shrinking withdraws
+        idle tokens right away and retires busy ones as they are released.
+        """
+        limit = max(1, limit)
+        delta = limit - self._target_worker_limit
+        self._target_worker_limit = limit
+        if delta > 0:
+            # Cancel outstanding withdrawals before adding new tokens
+            absorbed = min(delta, self._pending_shrink)
+            self._pending_shrink -= absorbed
+            for _ in range(delta - absorbed):
+                self._slot_sem.release()
+        elif delta < 0:
+            self._pending_shrink += -delta
+            # Acquiring an unlocked semaphore completes without suspending
+            while self._pending_shrink > 0 and not self._slot_sem.locked():
+                await self._slot_sem.acquire()
+                self._pending_shrink -= 1
 
     async def _sync_with_governor(self) -> None:
         """Sync target worker limit with the governor's recommendation."""
         if not self.governor:
             return
         while not self._stop_event.is_set():
-            target = self.governor.target_workers
-            async with self._slot_lock:
-                self._target_worker_limit = max(1, target)
-            await asyncio.sleep(1)
+            target = max(1, self.governor.target_workers)
+            if target != self._target_worker_limit:
+                await self.set_worker_limit(target)
+            await self.governor.target_changed.wait()
+            self.governor.target_changed.clear()
 
     async def _process_task(self, task: DownloadTask) -> None:
         """Handle downloading a single task with retry/backoff logic."""
         task_id = task.id
         url = sanitize_url(task.url)
 
-        self.active_tasks[task_id] = {
+        # Allocated once per task; later updates mutate it in place
+        status = self.active_tasks[task_id] = {
             "status": "starting",
             "progress": "0%",
             "speed": "0 B/s",
@@ -229,37 +334,17 @@ class DownloadManager:
 
         self.logger.info(f"Starting download: task_id={task_id}, url={url}")
         try:
-            file_path = await self._download(task)
+            file_path = await self._download(task, url)
             if not file_path or file_path == "":
                 self.logger.warning(f"No file path returned for task {task_id}, checking filesystem...")
-                # Try to find the downloaded file
-                try:
-                    import glob
-                    files = glob.glob(os.path.join(self.config.download_dir, "*"))
-                    if files:
-                        # Filter out aria2 control files and fragments
-                        files = [f for f in files if not any(ext in f for ext in ['.aria2', '-Frag', '__temp'])]
-                        # Get files modified in the last 5 minutes
-                        recent_files = [f for f in files if (time.time() - os.path.getmtime(f)) < 300]
-                        if recent_files:
-                            file_path = max(recent_files, key=os.path.getmtime)
-                            self.logger.info(f"Found recent file for task {task_id}: {file_path}")
-                        else:
-                            raise RuntimeError("No recent files found (after filtering fragments)")
-                    else:
-                        raise RuntimeError("No files in download directory")
-                except Exception as e:
-                    self.logger.error(f"Could not find downloaded file for task {task_id}: {e}")
-                    raise RuntimeError(f"Download completed but file not found: {e}")
+                file_path = self._find_recent_download()
+                if not file_path:
+                    self.logger.error(f"Could not find downloaded file for task {task_id}")
+                    raise RuntimeError("Download completed but file not found: no recent files in download directory")
+                self.logger.info(f"Found recent file for task {task_id}: {file_path}")
 
             # Mark as completed
-            self.active_tasks[task_id] = {
-                "status": "completed",
-                "progress": "100%",
-                "speed": "Done",
-                "eta": "0",
-                "url": url
-            }
+            status.update(status="completed", progress="100%", speed="Done", eta="0")
 
             await self.queue_manager.mark_completed(task_id, file_path)
             self.logger.info(f"Download completed: task_id={task_id}, file={file_path}")
@@ -267,14 +352,9 @@ class DownloadManager:
             self.logger.error(f"Download failed for task_id={task_id}: {exc}")
 
             # Mark as failed
-            self.active_tasks[task_id] = {
-                "status": "failed",
-                "progress": "0%",
-                "speed": "Failed",
-                "eta": "N/A",
-                "url": url,
-                "error": str(exc)
-            }
+            status.update(
+                status="failed", progress="0%", speed="Failed", eta="N/A", error=str(exc)
+            )
 
             # Determine whether to retry
             if task.attempts + 1 >= self.queue_manager.max_retries:
@@ -287,13 +367,22 @@ class DownloadManager:
                     f"Rescheduled task {task_id} (attempt {task.attempts + 1}/{self.queue_manager.max_retries})"
                 )
         finally:
-            # Keep in active tasks for a short time so status can be seen
-            await asyncio.sleep(2)
-            self.active_tasks.pop(task_id, None)
-
-    async def _download(self, task: DownloadTask) -> Optional[str]:
-        """Dispatch downloads based on URL schemes or explicit hints."""
-        url = sanitize_url(task.url)
+            # Keep in active tasks for a short time so status can be seen,
+            # without holding the worker's slot meanwhile
+            asyncio.get_running_loop().call_later(
+                STATUS_LINGER_SECONDS, self._forget_status, task_id, status
+            )
+
+    def _forget_status(self, task_id: int, status: Dict[str, str]) -> None:
+        """Drop a finished task's status unless the task has restarted since."""
+        if self.active_tasks.get(task_id) is status:
+            del self.active_tasks[task_id]
+
+    async def _download(self, task: DownloadTask, url: str) -> Optional[str]:
+        """Dispatch downloads based on URL schemes or explicit hints.
+
+        ``url`` is the already sanitised form of ``task.url``.
+        """
         if not url:
             raise RuntimeError("URL could not be sanitized")
         parsed = urlparse(url)
@@ -309,55 +398,38 @@ class DownloadManager:
         """Download a URL with yt-dlp in an executor."""
         self.logger.debug("Starting yt-dlp download for task %d", task.id)
         result = {"filepath": None}
+        task_status = self.active_tasks[task.id]
 
         def progress_hook(info: dict) -> None:
             status = info.get("status")
             self.logger.debug("Progress hook for task %d: %s", task.id, status)
             if status == "downloading":
-                percent_str = info.get("_percent_str", "0%")
-                speed_str = info.get("_speed_str", "0 B/s")
-                eta_str = info.get("_eta_str", "?")
-                self.active_tasks[task.id] = {
-                    "status": "downloading",
-                    "progress": percent_str,
-                    "speed": speed_str,
-                    "eta": eta_str,
-                    "url": url
-                }
+                # Called per fragment; update the shared dict in place
+                task_status["status"] = "downloading"
+                task_status["progress"] = info.get("_percent_str", "0%")
+                task_status["speed"] = info.get("_speed_str", "0 B/s")
+                task_status["eta"] = info.get("_eta_str", "?")
             elif status == "finished":
-                filename = info.get("filename") or info.get("_filename") or ""
-                if filename:
+                filename = (
+                    info.get("filename")
+                    or info.get("_filename")
+                    or info.get("info_dict", {}).get("_filename")
+                    or ""
+                )
+                if filename and not result["filepath"]:
                     result["filepath"] = filename
 
+        def post_hook(filepath: str) -> None:
+            # Called once with the final path after merging/post-processing
+            result["filepath"] = filepath
+
         def run_download() -> None:
             ydl_opts = {
-                "outtmpl": os.path.join(self.config.download_dir, "%(title)s.%(ext)s"),
+                **self._base_ydl_opts,
                 "progress_hooks": [progress_hook],
-                "format": "bestvideo+bestaudio/best",
-                "ignoreerrors": True,
-                "noplaylist": True,
-                "quiet": True,
-                "no_warnings": True,
-                "socket_timeout": self.config.socket_timeout,
-                "merge_output_format": self.config.preferred_format,
-                "writethumbnail": True,
-                "writedescription": True,
-                "writesubtitles": True,
-                "cachedir": False,
-                "concurrent_fragment_downloads": 16,
-                "external_downloader_args": [
-                    "--continue=true",
-                    "--max-tries=5",
-                ],
+                "post_hooks": [post_hook],
+                "external_downloader_args": list(self._base_ydl_opts["external_downloader_args"]),
             }
-            if self.config.use_aria2c and self.config.aria2_rpc_url:
-                ydl_opts["external_downloader"] = "aria2c"
-                ydl_opts["external_downloader_args"].extend([
-                    "--file-allocation=none",
-                    "--allow-overwrite=true",
-                ])
-            if self.config.cookies_file:
-                ydl_opts["cookiefile"] = self.config.cookies_file
 
             with YoutubeDL(ydl_opts) as ydl:
                 ydl.download([url])
@@ -366,39 +438,132 @@ class DownloadManager:
         await loop.run_in_executor(None, run_download)
         return result.get("filepath")
 
+    def _get_http_session(self) -> aiohttp.ClientSession:
+        """Return the shared HTTP session, creating it on first use."""
+        if self._http is None or self._http.closed:
+            timeout = aiohttp.ClientTimeout(
+                total=None,
+                sock_connect=self.config.socket_timeout,
+                sock_read=self.config.socket_timeout,
+            )
+            connector = aiohttp.TCPConnector(limit=self.config.max_concurrent, ttl_dns_cache=300)
+            self._http = aiohttp.ClientSession(timeout=timeout, connector=connector)
+        return self._http
+
     async def _download_file_url(self, url: str) -> Optional[str]:
-        """Download a plain HTTP(S) file via requests streaming."""
-        self.logger.debug("Starting file download for %s", url)
-        loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(None, self._download_file_blocking, url)
+        """Download a plain HTTP(S) file via aiohttp streaming.
 
-    def _download_file_blocking(self, url: str) -> str:
+        The transfer runs on the event loop; only disk writes go to the
+        executor.
+        """
+        self.logger.debug("Starting file download for %s", url)
+        session = self._get_http_session()
         try:
-            with requests.get(url, stream=True, timeout=self.config.socket_timeout) as response:
+            async with session.get(url) as response:
                 response.raise_for_status()
                 filename = self._derive_filename(url, response.headers)
                 os.makedirs(self.config.download_dir, exist_ok=True)
                 dest_path = os.path.join(self.config.download_dir, filename)
                 with open(dest_path, "wb") as dest:
-                    for chunk in response.iter_content(chunk_size=64 * 1024):
-                        if chunk:
-                            dest.write(chunk)
+                    await self._stream_to_file(response, dest)
                 return dest_path
-        except requests.RequestException as exc:
+        except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
             self.logger.error("HTTP file download failed for %s: %s", url, exc)
             raise RuntimeError(f"HTTP download failed: {exc}") from exc
 
+    @staticmethod
+    async def _stream_to_file(response: aiohttp.ClientResponse, dest) -> None:
+        """Copy a response body into ``dest`` through two reusable buffers.
+
+        Network reads are packed into one preallocated buffer while the
+        other is written by the executor, so writes are full-sized and no
+        per-chunk write buffers are allocated. Every ``FADVISE_WINDOW``
+        bytes the written range is advised out of the page cache, since
+        finished downloads are not read back by this process.
+        """
+        loop = asyncio.get_running_loop()
+        written = 0
+        advised = 0
+
+        def write(chunk: memoryview) -> None:
+            nonlocal written, advised
+            dest.write(chunk)
+            written += len(chunk)
+            if _HAS_FADVISE and written - advised >= FADVISE_WINDOW:
+                dest.flush()
+                os.posix_fadvise(dest.fileno(), advised, written - advised, os.POSIX_FADV_DONTNEED)
+                advised = written
+
+        buffers = [memoryview(bytearray(FILE_CHUNK_SIZE)) for _ in range(2)]
+        current = 0
+        filled = 0
+        pending_write = None
+        try:
+            async for data in response.content.iter_any():
+                data = memoryview(data)
+                offset = 0
+                while offset < len(data):
+                    n = min(len(data) - offset, FILE_CHUNK_SIZE - filled)
+                    buffers[current][filled:filled + n] = data[offset:offset + n]
+                    filled += n
+                    offset += n
+                    if filled == FILE_CHUNK_SIZE:
+                        # The other buffer is reused next, so its write must finish first
+                        if pending_write is not None:
+                            await asyncio.shield(pending_write)
+                        pending_write = loop.run_in_executor(None, write, buffers[current])
+                        current ^= 1
+                        filled = 0
+            if filled:
+                if pending_write is not None:
+                    await asyncio.shield(pending_write)
+                pending_write = loop.run_in_executor(None, write, buffers[current][:filled])
+            if pending_write is not None:
+                await asyncio.shield(pending_write)
+                pending_write = None
+        finally:
+            # On errors and cancellation the caller closes dest next, so a write
+            # still running in the executor has to finish first
+            if pending_write is not None:
+                with suppress(Exception):
+                    await asyncio.shield(pending_write)
+
     async def _download_magnet(self, task: DownloadTask, url: str) -> Optional[str]:
         if not self.aria2_manager:
             raise RuntimeError("aria2 RPC is not configured for magnet downloads")
-        loop = asyncio.get_running_loop()
-        gid = await loop.run_in_executor(None, self.aria2_manager.add_magnet, url)
+        gid = await self.aria2_manager.add_magnet(url)
         self.active_tasks[task.id].update(
             {"status": "queued", "progress": "0%", "speed": "aria2", "eta": "?"}
         )
         identifier = gid or "submitted"
         return f"aria2:{identifier}"
 
+    def _find_recent_download(self, max_age: float = 300) -> Optional[str]:
+        """Return the newest completed file in the download directory.
+
+        Fallback for downloads that did not report a path. A single
+        ``os.scandir`` pass reuses the directory entry's cached stat data;
+        aria2 control files and partial fragments are skipped.
+        """
+        cutoff = time.time() - max_age
+        newest_path, newest_mtime = None, cutoff
+        try:
+            with os.scandir(self.config.download_dir) as entries:
+                for entry in entries:
+                    if any(marker in entry.name for marker in (".aria2", "-Frag", "__temp")):
+                        continue
+                    try:
+                        if not entry.is_file():
+                            continue
+                        mtime = entry.stat().st_mtime
+                    except OSError:
+                        continue
+                    if mtime > newest_mtime:
+                        newest_path, newest_mtime = entry.path, mtime
+        except OSError as exc:
+            self.logger.error("Could not scan download directory: %s", exc)
+        return newest_path
+
     def _derive_filename(self, url: str, headers: dict) -> str:
         disposition = headers.get("content-disposition", "")
         if disposition:
@@ -412,7 +577,7 @@ class DownloadManager:
         return f"file_{int(time.time())}"
 
     def _extract_filename_from_disposition(self, disposition: str) -> Optional[str]:
-        match = re.search(r'filename\*?=(?:UTF-8\'\')?"?([^";]+)"?', disposition)
+        match = _DISPOSITION_FILENAME_RE.search(disposition)
         if match:
             return match.group(1)
         return None
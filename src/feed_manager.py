@@ -3,19 +3,52 @@
 from __future__ import annotations
 
 import asyncio
+import io
+import json
+import sqlite3
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 import aiohttp
 import aiosqlite
 import feedparser
 
+try:
+    from asyncio import timeout as async_timeout
+except ImportError:  # Python < 3.11; async-timeout ships with aiohttp there
+    from async_timeout import timeout as async_timeout
+
 from .queue_manager import QueueManager
 from .utils import validators
+from .utils.db import SQLITE_PRAGMAS
 from .utils.logger import get_logger
 
 
+# Upper bound on feeds fetched at the same time during one poll cycle
+MAX_CONCURRENT_FETCHES = 16
+
+# Feed bodies are streamed in chunks of this size and rejected above the cap,
+# bounding memory to MAX_CONCURRENT_FETCHES * MAX_FEED_BYTES per poll cycle
+FEED_CHUNK_SIZE = 64 * 1024
+MAX_FEED_BYTES = 16 * 1024 * 1024
+
+# Feeds are polled every few minutes from a handful of hosts; cache DNS and
+# keep idle connections long enough to be reused by the next poll cycle
+FEED_DNS_CACHE_TTL = 600
+FEED_KEEPALIVE_TIMEOUT = 300
+FEED_HEADERS = {"User-Agent": "autodl-enhanced/1.0", "Accept-Encoding": "gzip, deflate"}
+
+# Minimum number of entry keys remembered per feed
+SEEN_KEYS_LIMIT = 200
+
+# (feed_id, last_entry_id, etag, last_modified, seen_keys_json) persisted
+# after each poll; a ``None`` seen_keys_json leaves the stored keys as-is
+FeedUpdate = Tuple[int, Optional[str], Optional[str], Optional[str], Optional[str]]
+
+
 @dataclass
 class Feed:
     id: int
@@ -23,6 +56,8 @@ class Feed:
     added_at: float
     last_polled: Optional[float]
     last_entry_id: Optional[str]
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
 
 
 class FeedManager:
@@ -41,27 +76,60 @@ class FeedManager:
         self.timeout = timeout
         self.logger = get_logger(self.__class__.__name__)
         self._session: Optional[aiohttp.ClientSession] = None
+        self._conn: Optional[aiosqlite.Connection] = None
+        # Serialises writes on the shared connection
+        self._db_lock = asyncio.Lock()
         self._task: Optional[asyncio.Task] = None
         self._stop_event = asyncio.Event()
+        # Recently seen entry keys per feed id, oldest first
+        self._seen: Dict[int, Dict[str, None]] = {}
+        # feedparser is synchronous and CPU-bound; keep it off the event loop
+        self._parse_executor: Optional[ThreadPoolExecutor] = None
 
     async def initialize(self) -> None:
         """Prepare storage and HTTP client."""
-        async with aiosqlite.connect(self.db_path) as conn:
-            await conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS feeds (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    url TEXT NOT NULL UNIQUE,
-                    added_at REAL NOT NULL,
-                    last_polled REAL,
-                    last_entry_id TEXT
-                )
-                """
+        if self._conn is None:
+            self._conn = await aiosqlite.connect(self.db_path)
+            for pragma in SQLITE_PRAGMAS:
+                await self._conn.execute(pragma)
+        await self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS feeds (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT NOT NULL UNIQUE,
+                added_at REAL NOT NULL,
+                last_polled REAL,
+                last_entry_id TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                seen_keys TEXT
             )
-            await conn.commit()
+            """
+        )
+        # Add HTTP validator columns to databases created before they existed
+        cursor = await self._conn.execute("PRAGMA table_info(feeds)")
+        columns = {row[1] for row in await cursor.fetchall()}
+        for column in ("etag", "last_modified", "seen_keys"):
+            if column not in columns:
+                await self._conn.execute(f"ALTER TABLE feeds ADD COLUMN {column} TEXT")
+        await self._conn.commit()
+        cursor = await self._conn.execute("SELECT id, seen_keys FROM feeds WHERE seen_keys IS NOT NULL")
+        self._seen = {
+            feed_id: dict.fromkeys(json.loads(seen_keys))
+            for feed_id, seen_keys in await cursor.fetchall()
+        }
+        if self._parse_executor is None:
+            self._parse_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="feedparse")
         if self._session is None:
             timeout = aiohttp.ClientTimeout(total=self.timeout)
-            self._session = aiohttp.ClientSession(timeout=timeout)
+            connector = aiohttp.TCPConnector(
+                limit=MAX_CONCURRENT_FETCHES * 2,
+                ttl_dns_cache=FEED_DNS_CACHE_TTL,
+                keepalive_timeout=max(FEED_KEEPALIVE_TIMEOUT, self.poll_interval + 30),
+            )
+            self._session = aiohttp.ClientSession(
+                timeout=timeout, connector=connector, headers=FEED_HEADERS
+            )
 
     async def add_feed(self, url: str) -> tuple[int, bool]:
         """Add a new feed to the database."""
@@ -69,36 +137,55 @@ class FeedManager:
         if not normalized:
             raise ValueError("Invalid feed URL")
         now = time.time()
-        async with aiosqlite.connect(self.db_path) as conn:
-            try:
+        conn = self._require_conn()
+        async with self._db_lock:
+            if sqlite3.sqlite_version_info >= (3, 35, 0):
+                # Insert or look up in one statement; a no-op update makes
+                # RETURNING yield the existing row on conflict
                 cursor = await conn.execute(
                     """
                     INSERT INTO feeds (url, added_at)
                     VALUES (?, ?)
+                    ON CONFLICT(url) DO UPDATE SET url = excluded.url
+                    RETURNING id, added_at
                     """,
                     (normalized, now),
                 )
+                feed_id, added_at = await cursor.fetchone()
                 await conn.commit()
-                feed_id = cursor.lastrowid
+                created = added_at == now
+            else:
+                feed_id, created = await self._insert_feed_legacy(conn, normalized, now)
+            if created:
                 self.logger.info("Added feed %s (id=%d)", normalized, feed_id)
-                return feed_id, True
-            except aiosqlite.IntegrityError:
-                cursor = await conn.execute(
-                    "SELECT id FROM feeds WHERE url = ?",
-                    (normalized,),
-                )
-                row = await cursor.fetchone()
-                feed_id = row[0] if row else 0
+            else:
                 self.logger.info("Feed already registered: %s (id=%s)", normalized, feed_id)
-                return feed_id, False
+            return feed_id, created
 
-    async def list_feeds(self) -> List[Feed]:
-        """Return all configured feeds."""
-        async with aiosqlite.connect(self.db_path) as conn:
+    @staticmethod
+    async def _insert_feed_legacy(
+        conn: aiosqlite.Connection, url: str, now: float
+    ) -> tuple[int, bool]:
+        """INSERT then SELECT on conflict, for SQLite without RETURNING."""
+        try:
             cursor = await conn.execute(
-                "SELECT id, url, added_at, last_polled, last_entry_id FROM feeds ORDER BY id"
+                "INSERT INTO feeds (url, added_at) VALUES (?, ?)",
+                (url, now),
             )
-            rows = await cursor.fetchall()
+            await conn.commit()
+            return cursor.lastrowid, True
+        except aiosqlite.IntegrityError:
+            await conn.rollback()
+            cursor = await conn.execute("SELECT id FROM feeds WHERE url = ?", (url,))
+            row = await cursor.fetchone()
+            return (row[0] if row else 0), False
+
+    async def list_feeds(self) -> List[Feed]:
+        """Return all configured feeds."""
+        cursor = await self._require_conn().execute(
+            "SELECT id, url, added_at, last_polled, last_entry_id, etag, last_modified FROM feeds ORDER BY id"
+        )
+        rows = await cursor.fetchall()
         return [Feed(*row) for row in rows]
 
     async def start(self, queue_manager: QueueManager) -> None:
@@ -117,6 +204,17 @@ class FeedManager:
         if self._session:
             await self._session.close()
             self._session = None
+        if self._conn:
+            await self._conn.close()
+            self._conn = None
+        if self._parse_executor:
+            self._parse_executor.shutdown(wait=False)
+            self._parse_executor = None
+
+    def _require_conn(self) -> aiosqlite.Connection:
+        if self._conn is None:
+            raise RuntimeError("FeedManager database not initialized")
+        return self._conn
 
     async def _poll_loop(self, queue_manager: QueueManager) -> None:
         """Periodic polling loop."""
@@ -125,77 +223,150 @@ class FeedManager:
                 await self._poll_once(queue_manager)
             except Exception as exc:
                 self.logger.exception("Feed polling failed: %s", exc)
-            try:
-                await asyncio.wait_for(self._stop_event.wait(), timeout=self.poll_interval)
-            except asyncio.TimeoutError:
-                continue
+            with suppress(asyncio.TimeoutError):
+                async with async_timeout(self.poll_interval):
+                    await self._stop_event.wait()
 
     async def _poll_once(self, queue_manager: QueueManager) -> None:
         feeds = await self.list_feeds()
         if not feeds:
             return
-        for feed in feeds:
-            if self._stop_event.is_set():
-                break
-            await self._process_feed(feed, queue_manager)
+        # Fetch feeds concurrently so one slow host does not stall the rest
+        semaphore = asyncio.Semaphore(min(MAX_CONCURRENT_FETCHES, len(feeds)))
+
+        async def run(feed: Feed) -> Optional[FeedUpdate]:
+            async with semaphore:
+                if self._stop_event.is_set():
+                    return None
+                return await self._process_feed(feed, queue_manager)
+
+        results = await asyncio.gather(*(run(feed) for feed in feeds), return_exceptions=True)
+        updates = []
+        for feed, result in zip(feeds, results):
+            if isinstance(result, Exception):
+                self.logger.error("Failed to process feed %s: %s", feed.url, result)
+            elif result is not None:
+                updates.append(result)
+        await self._bulk_update_feeds(updates)
 
-    async def _process_feed(self, feed: Feed, queue_manager: QueueManager) -> None:
+    async def _process_feed(
+        self, feed: Feed, queue_manager: QueueManager
+    ) -> Optional[FeedUpdate]:
+        """Poll one feed and enqueue its new entries.
+
+        Sends a conditional GET using the stored ETag/Last-Modified so an
+        unchanged feed costs neither a body transfer nor a parse. Returns
+        the values to persist, or ``None`` if the feed could not be fetched.
+        """
         if not self._session:
             raise RuntimeError("FeedManager session not initialized")
+        headers = {}
+        if feed.etag:
+            headers["If-None-Match"] = feed.etag
+        if feed.last_modified:
+            headers["If-Modified-Since"] = feed.last_modified
         try:
-            async with self._session.get(feed.url) as response:
+            async with self._session.get(feed.url, headers=headers) as response:
+                if response.status == 304:
+                    self.logger.debug("Feed %s not modified", feed.url)
+                    return feed.id, feed.last_entry_id, feed.etag, feed.last_modified, None
                 if response.status != 200:
                     self.logger.warning("Feed %s returned HTTP %s", feed.url, response.status)
-                    await self._update_feed(feed.id, feed.last_entry_id)
-                    return
-                raw = await response.read()
+                    return feed.id, feed.last_entry_id, feed.etag, feed.last_modified, None
+                etag = response.headers.get("ETag")
+                last_modified = response.headers.get("Last-Modified")
+                raw = await self._read_body(response)
         except Exception as exc:
             self.logger.error("Failed to fetch feed %s: %s", feed.url, exc)
-            return
+            return None
 
-        parsed = feedparser.parse(raw)
+        loop = asyncio.get_running_loop()
+        parsed = await loop.run_in_executor(self._parse_executor, feedparser.parse, raw)
         entries = parsed.entries or []
         if not entries:
-            await self._update_feed(feed.id, feed.last_entry_id)
-            return
+            return feed.id, feed.last_entry_id, etag, last_modified, None
 
+        seen = self._seen.get(feed.id, {})
+        keys = [self._entry_key(entry) for entry in entries]
         new_entries = []
-        for entry in entries:
-            key = self._entry_key(entry)
-            if not key:
+        for entry, key in zip(entries, keys):
+            if not key or key in seen:
                 continue
-            if feed.last_entry_id and key == feed.last_entry_id:
+            # Feeds stored before seen keys were tracked only know their newest entry
+            if not seen and feed.last_entry_id and key == feed.last_entry_id:
                 break
             new_entries.append(entry)
 
-        latest_key = self._entry_key(entries[0])
+        latest_key = keys[0]
+        # Work on a copy: if enqueueing fails, the next poll must still see
+        # these entries as new
+        updated = dict(seen)
+        self._remember_keys(updated, keys)
         limited = new_entries[: self.max_items_per_poll]
-        if not limited:
-            await self._update_feed(feed.id, latest_key)
-            return
+        if limited:
+            # Oldest first, enqueued in a single transaction
+            urls = [validators.sanitize_url(self._entry_link(entry)) for entry in reversed(limited)]
+            results = await queue_manager.add_tasks([url for url in urls if url])
+            enqueued = sum(1 for _, is_new in results if is_new)
+            self.logger.info("Feed %s added %d new entries", feed.url, enqueued)
+        self._seen[feed.id] = updated
+        return feed.id, latest_key, etag, last_modified, json.dumps(list(updated))
 
-        enqueued = 0
-        for entry in reversed(limited):
-            url = self._entry_link(entry)
-            sanitized = validators.sanitize_url(url)
-            if not sanitized:
-                continue
-            task_id, is_new = await queue_manager.add_task(sanitized)
-            if is_new:
-                enqueued += 1
-        self.logger.info("Feed %s added %d new entries", feed.url, enqueued)
-        await self._update_feed(feed.id, latest_key)
+    @staticmethod
+    async def _read_body(response: aiohttp.ClientResponse) -> io.BytesIO:
+        """Stream a feed body into memory, enforcing MAX_FEED_BYTES.
 
-    async def _update_feed(self, feed_id: int, last_entry_id: Optional[str]) -> None:
+        feedparser has no incremental API and reads its input in one go,
+        so the body is still assembled in full; streaming lets oversized
+        feeds be rejected without buffering them. The result is wrapped in
+        a file-like object, which also stops feedparser from first trying
+        to open the raw bytes as a filename.
+        """
+        if response.content_length and response.content_length > MAX_FEED_BYTES:
+            raise ValueError(f"feed is larger than {MAX_FEED_BYTES} bytes")
+        chunks = []
+        size = 0
+        async for chunk in response.content.iter_chunked(FEED_CHUNK_SIZE):
+            size += len(chunk)
+            if size > MAX_FEED_BYTES:
+                raise ValueError(f"feed is larger than {MAX_FEED_BYTES} bytes")
+            chunks.append(chunk)
+        return io.BytesIO(b"".join(chunks))
+
+    @staticmethod
+    def _remember_keys(seen: Dict[str, None], keys: List[Optional[str]]) -> None:
+        """Record the current snapshot of entry keys, newest last.
+
+        Every key in the snapshot is kept so entries skipped by
+        ``max_items_per_poll`` are not picked up on a later poll; beyond
+        that, the oldest keys are dropped once SEEN_KEYS_LIMIT is exceeded.
+        """
+        present = [key for key in keys if key]
+        for key in reversed(present):
+            seen.pop(key, None)
+            seen[key] = None
+        excess = len(seen) - max(SEEN_KEYS_LIMIT, len(present))
+        for key in list(seen)[:max(0, excess)]:
+            del seen[key]
+
+    async def _bulk_update_feeds(self, updates: List[FeedUpdate]) -> None:
+        """Persist poll results for several feeds in a single transaction."""
+        if not updates:
+            return
         now = time.time()
-        async with aiosqlite.connect(self.db_path) as conn:
-            await conn.execute(
+        conn = self._require_conn()
+        async with self._db_lock:
+            await conn.executemany(
                 """
                 UPDATE feeds
-                SET last_polled = ?, last_entry_id = ?
+                SET last_polled = ?, last_entry_id = ?, etag = ?, last_modified = ?,
+                    seen_keys = COALESCE(?, seen_keys)
                 WHERE id = ?
                 """,
-                (now, last_entry_id, feed_id),
+                [
+                    (now, last_entry_id, etag, last_modified, seen_keys, feed_id)
+                    for feed_id, last_entry_id, etag, last_modified, seen_keys in updates
+                ],
             )
             await conn.commit()
 
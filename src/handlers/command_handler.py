@@ -9,6 +9,8 @@ download_manager).
 from __future__ import annotations
 
 import asyncio
+import sqlite3
+from itertools import islice
 from typing import Any, Dict
 
 from telegram import Update
@@ -18,6 +20,45 @@ from ..utils import performance, validators
 from ..utils.cookie_manager import CookieManager
 
 
+# Static replies, built once at import
+_UNAUTHORIZED_MESSAGE = "❌ You are not authorized to use this command."
+_WELCOME_MESSAGE = (
+    "👋 *Welcome to the Enhanced AutoDL Bot!*\n\n"
+    "Send me a YouTube or other supported media link and I'll add it to the queue.\n"
+    "You can also send a `.txt` file containing one URL per line.\n\n"
+    "Commands:\n"
+    "/queue – Show pending tasks\n"
+    "/status – Show active downloads and system resource usage\n"
+    "/pause – Pause all downloads\n"
+    "/resume – Resume downloads if paused\n"
+    "/retry – Retry all failed downloads\n"
+    "/clear – Clear permanently failed tasks\n"
+    "/addcookies – Add cookies from a file (appends to existing cookies)\n"
+    "/cookies – Show cookie statistics"
+    "\n/add_feed <url> – Register an RSS/Atom feed for auto-enqueueing\n"
+    "/add_magnet <link> – Queue a magnet link via aria2\n"
+    "/add_file_url <url> – Download a plain HTTP(S) file\n"
+    "/set_concurrency_limits <min> <max> <cpu%> <disk%> – Tune worker limits"
+)
+_ADDCOOKIES_MESSAGE = (
+    "🍪 *Add Cookies*\n\n"
+    "Please send a `.txt` file containing cookies in Netscape format.\n"
+    "These cookies will be appended to the existing cookies file (not replaced).\n\n"
+    "Format: Each line should follow the Netscape cookie format:\n"
+    "`domain flag path secure expiration name value`"
+)
+
+# Active downloads listed in /status; the rest would not fit in one message
+MAX_STATUS_LINES = 40
+
+# Labels for active task states that show the URL instead of progress
+_STATUS_LABELS = {
+    "completed": "✅ COMPLETED",
+    "starting": "🔄 STARTING",
+    "postprocessing": "🔄 POST-PROCESSING",
+}
+
+
 def _is_authorized(update: Update, context: ContextTypes.DEFAULT_TYPE) -> bool:
     """Check if the user is authorized to execute privileged commands."""
     if not update.effective_user:
@@ -25,33 +66,18 @@ def _is_authorized(update: Update, context: ContextTypes.DEFAULT_TYPE) -> bool:
     config = context.bot_data.get("config")
     if not config:
         return False
-    user_id = str(update.effective_user.id)
-    if not config.admin_ids or not config.admin_ids[0]:
-        return True
-    return user_id in config.admin_ids
+    admins = config.admin_id_set
+    return not admins or str(update.effective_user.id) in admins
+
+
+def _shorten(text: str, limit: int) -> str:
+    """Truncate ``text`` to ``limit`` characters, ending in "..." when cut."""
+    return text if len(text) <= limit else f"{text:.{limit - 3}}..."
 
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Send a welcome message when the user invokes /start."""
-    message = (
-        "👋 *Welcome to the Enhanced AutoDL Bot!*\n\n"
-        "Send me a YouTube or other supported media link and I'll add it to the queue.\n"
-        "You can also send a `.txt` file containing one URL per line.\n\n"
-        "Commands:\n"
-        "/queue – Show pending tasks\n"
-        "/status – Show active downloads and system resource usage\n"
-        "/pause – Pause all downloads\n"
-        "/resume – Resume downloads if paused\n"
-        "/retry – Retry all failed downloads\n"
-        "/clear – Clear permanently failed tasks\n"
-        "/addcookies – Add cookies from a file (appends to existing cookies)\n"
-        "/cookies – Show cookie statistics"
-        "\n/add_feed <url> – Register an RSS/Atom feed for auto-enqueueing\n"
-        "/add_magnet <link> – Queue a magnet link via aria2\n"
-        "/add_file_url <url> – Download a plain HTTP(S) file\n"
-        "/set_concurrency_limits <min> <max> <cpu%> <disk%> – Tune worker limits"
-    )
-    await update.message.reply_markdown(message)
+    await update.message.reply_markdown(_WELCOME_MESSAGE)
 
 
 async def queue(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -60,12 +86,12 @@ async def queue(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     if queue_manager is None:
         await update.message.reply_text("Queue manager not available.")
         return
-    pending_tasks = await queue_manager.get_pending_tasks()
+    pending_tasks, total = await queue_manager.get_pending_preview(limit=10)
     if not pending_tasks:
         await update.message.reply_text("✅ The queue is empty.")
         return
-    lines = [f"• Task {t.id}: {t.url} (attempts: {t.attempts})" for t in pending_tasks[:10]]
-    more = "" if len(pending_tasks) <= 10 else f"\n…and {len(pending_tasks) - 10} more tasks"
+    lines = [f"• Task {t.id}: {t.url} (attempts: {t.attempts})" for t in pending_tasks]
+    more = "" if total <= 10 else f"\n…and {total - 10} more tasks"
     await update.message.reply_text(
         "📋 Pending tasks (showing up to 10):\n" + "\n".join(lines) + more
     )
@@ -79,71 +105,34 @@ async def status(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         await update.message.reply_text("Status information unavailable.")
         return
     active = download_manager.get_active_status()
-    processing_tasks = await queue_manager.get_processing_tasks()
+    processing_count = await queue_manager.count_by_status("processing")
 
-    # Get recent failed tasks (from last 10 minutes) - simplified approach
-    recent_failed = []
+    # Failures from the last 10 minutes; the report still goes out without them
     try:
-        # Query failed tasks directly from database
-        import sqlite3
-        import time
-        db_path = queue_manager.db_path
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        current_time = time.time()
-
-        cursor.execute("""
-            SELECT id, url, status, attempts, added_at, updated_at, next_attempt_at, file_path, error_message
-            FROM tasks
-            WHERE status='failed' AND updated_at > ?
-            ORDER BY updated_at DESC
-            LIMIT 5
-        """, (current_time - 600,))  # Last 10 minutes
-
-        for row in cursor.fetchall():
-            task_id, url, status, attempts, added_at, updated_at, next_attempt_at, file_path, error_message = row
-            # Create a simple object to hold the task info
-            class SimpleTask:
-                def __init__(self, id, url, error_message):
-                    self.id = id
-                    self.url = url
-                    self.error_message = error_message
-            recent_failed.append(SimpleTask(task_id, url, error_message))
-
-        conn.close()
-    except:
-        pass  # Ignore if we can't get recent failed tasks
+        recent_failed = await queue_manager.get_recent_failed(600, 5)
+    except sqlite3.Error:
+        recent_failed = []
 
     lines = []
 
     if active:
         lines.append("📥 *Active downloads:*\n")
-        for task_id, info in active.items():
+        for task_id, info in islice(active.items(), MAX_STATUS_LINES):
             status = info.get('status', 'unknown')
-            progress = info.get('progress', '0%')
-            speed = info.get('speed', '?')
-            eta = info.get('eta', '?')
-
-            # Format URL to be shorter for display
-            url = info.get('url', '')
-            if len(url) > 50:
-                url = url[:47] + "..."
-
+            url = _shorten(info.get('url', ''), 50)
             if status == 'failed':
                 error_msg = info.get('error', '')
-                if error_msg:
-                    error_msg = f" - {error_msg[:30]}..."
-                line = f"• Task {task_id}: ❌ FAILED{error_msg} - {url}"
-            elif status == 'completed':
-                line = f"• Task {task_id}: ✅ COMPLETED - {url}"
-            elif status == 'starting':
-                line = f"• Task {task_id}: 🔄 STARTING - {url}"
-            elif status == 'postprocessing':
-                line = f"• Task {task_id}: 🔄 POST-PROCESSING - {url}"
+                error_msg = f" - {error_msg:.30}..." if error_msg else ""
+                lines.append(f"• Task {task_id}: ❌ FAILED{error_msg} - {url}")
+            elif status in _STATUS_LABELS:
+                lines.append(f"• Task {task_id}: {_STATUS_LABELS[status]} - {url}")
             else:
-                line = f"• Task {task_id}: {progress} at {speed} (ETA: {eta})"
-
-            lines.append(line)
+                lines.append(
+                    f"• Task {task_id}: {info.get('progress', '0%')} at {info.get('speed', '?')} "
+                    f"(ETA: {info.get('eta', '?')})"
+                )
+        if len(active) > MAX_STATUS_LINES:
+            lines.append(f"…and {len(active) - MAX_STATUS_LINES} more")
     else:
         lines.append("📥 No active downloads.")
 
@@ -151,31 +140,29 @@ async def status(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     if recent_failed:
         lines.append(f"\n❌ *Recent failures ({len(recent_failed)}):*")
         for task in recent_failed[:5]:  # Show up to 5 recent failures
-            url_short = task.url[:40] + "..." if len(task.url) > 40 else task.url
-            error_short = task.error_message[:30] + "..." if task.error_message and len(task.error_message) > 30 else (task.error_message or "Unknown error")
+            url_short = f"{task.url:.40}..." if len(task.url) > 40 else task.url
+            error = task.error_message
+            error_short = (f"{error:.30}..." if len(error) > 30 else error) if error else "Unknown error"
             lines.append(f"• Task {task.id}: {url_short} - {error_short}")
 
     # Show processing tasks count
-    processing_count = len(processing_tasks) if processing_tasks else 0
-    if processing_count > 0:
+    if processing_count:
         lines.append(f"\n⚙️ {processing_count} tasks being processed")
     # System performance
-    cpu = performance.get_cpu_usage()
-    mem = performance.get_memory_usage()
-    disk = performance.get_disk_usage(download_manager.config.download_dir)
-    sys_info = (
-        f"\n*System resources*:\n"
-        f"• CPU usage: {cpu:.1f}%\n"
-        f"• Memory usage: {mem:.1f}%\n"
-        f"• Disk usage: {disk:.1f}%"
+    stats = performance.snapshot(download_manager.config.download_dir)
+    lines.append(
+        f"*System resources*:\n"
+        f"• CPU usage: {stats.cpu:.1f}%\n"
+        f"• Memory usage: {stats.memory:.1f}%\n"
+        f"• Disk usage: {stats.disk:.1f}%"
     )
-    await update.message.reply_markdown("\n".join(lines) + sys_info)
+    await update.message.reply_markdown("\n".join(lines))
 
 
 async def pause(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Pause all downloads and stop new tasks from starting."""
     if not _is_authorized(update, context):
-        await update.message.reply_text("❌ You are not authorized to use this command.")
+        await update.message.reply_text(_UNAUTHORIZED_MESSAGE)
         return
     download_manager = context.bot_data.get("download_manager")
     if download_manager is None:
@@ -188,7 +175,7 @@ async def pause(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
 async def resume(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Resume downloads if they are paused."""
     if not _is_authorized(update, context):
-        await update.message.reply_text("❌ You are not authorized to use this command.")
+        await update.message.reply_text(_UNAUTHORIZED_MESSAGE)
         return
     download_manager = context.bot_data.get("download_manager")
     if download_manager is None:
@@ -204,7 +191,7 @@ async def resume(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
 async def clear(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Clear permanently failed tasks from the queue."""
     if not _is_authorized(update, context):
-        await update.message.reply_text("❌ You are not authorized to use this command.")
+        await update.message.reply_text(_UNAUTHORIZED_MESSAGE)
         return
     queue_manager = context.bot_data.get("queue_manager")
     if queue_manager is None:
@@ -235,14 +222,7 @@ async def addcookies(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None
     Sets state so message handler knows to process next file as cookies.
     """
     context.user_data["awaiting_cookie_file"] = True
-    message = (
-        "🍪 *Add Cookies*\n\n"
-        "Please send a `.txt` file containing cookies in Netscape format.\n"
-        "These cookies will be appended to the existing cookies file (not replaced).\n\n"
-        "Format: Each line should follow the Netscape cookie format:\n"
-        "`domain flag path secure expiration name value`"
-    )
-    await update.message.reply_markdown(message)
+    await update.message.reply_markdown(_ADDCOOKIES_MESSAGE)
 
 
 async def cookies(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -252,10 +232,7 @@ async def cookies(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         await update.message.reply_text("Cookie file not configured.")
         return
 
-    from pathlib import Path
-    cookies_path = Path(config.cookies_file)
-
-    summary = CookieManager.get_cookies_summary(cookies_path)
+    summary = CookieManager.get_cookies_summary(config.cookies_path)
 
     if summary["total"] == 0:
         await update.message.reply_text("📊 No cookies found in the cookies file.")
@@ -274,7 +251,7 @@ async def cookies(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
 async def add_feed(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Register a new RSS/Atom feed URL for automatic enqueuing."""
     if not _is_authorized(update, context):
-        await update.message.reply_text("❌ You are not authorized to use this command.")
+        await update.message.reply_text(_UNAUTHORIZED_MESSAGE)
         return
     feed_manager = context.bot_data.get("feed_manager")
     if feed_manager is None:
@@ -303,7 +280,7 @@ async def add_feed(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
 async def add_magnet(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Add a magnet link directly to the download queue."""
     if not _is_authorized(update, context):
-        await update.message.reply_text("❌ You are not authorized to use this command.")
+        await update.message.reply_text(_UNAUTHORIZED_MESSAGE)
         return
     queue_manager = context.bot_data.get("queue_manager")
     if queue_manager is None:
@@ -327,7 +304,7 @@ async def add_magnet(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None
 async def add_file_url(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Queue a plain HTTP(S) file URL to download via streaming requests."""
     if not _is_authorized(update, context):
-        await update.message.reply_text("❌ You are not authorized to use this command.")
+        await update.message.reply_text(_UNAUTHORIZED_MESSAGE)
         return
     queue_manager = context.bot_data.get("queue_manager")
     if queue_manager is None:
@@ -351,7 +328,7 @@ async def add_file_url(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
 async def set_concurrency_limits(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Adjust runtime concurrency limits and thresholds."""
     if not _is_authorized(update, context):
-        await update.message.reply_text("❌ You are not authorized to use this command.")
+        await update.message.reply_text(_UNAUTHORIZED_MESSAGE)
         return
     if len(context.args) != 4:
         await update.message.reply_text("Usage: /set_concurrency_limits <min> <max> <cpu%> <disk%>")
@@ -380,8 +357,7 @@ async def set_concurrency_limits(update: Update, context: ContextTypes.DEFAULT_T
         config.max_concurrent = max_workers
         config.concurrency_cpu_threshold = cpu_threshold
         config.concurrency_disk_threshold = disk_threshold
-    async with download_manager._slot_lock:
-        download_manager._target_worker_limit = max(1, governor.target_workers)
+    await download_manager.set_worker_limit(governor.target_workers)
     await update.message.reply_text(
         f"✅ Concurrency range set to {min_workers}-{max_workers} with CPU {cpu_threshold}% and disk {disk_threshold}% thresholds."
     )
@@ -8,9 +8,11 @@ as a potential URL.
 
 from __future__ import annotations
 
-from typing import List
+import asyncio
+from typing import List, Tuple
 
 from telegram import Update, Document
+from telegram.error import TelegramError
 from telegram.ext import ContextTypes
 
 from ..utils import validators
@@ -24,6 +26,63 @@ logger = logging.getLogger(__name__)
 
 MAX_FILE_SIZE_MB = 10
 MAX_LINE_COUNT = 10000
+# Uploads are at most MAX_FILE_SIZE_MB, so a few large reads cover a whole file
+UPLOAD_READ_BUFFER = 1024 * 1024
+# Playlist extractions run in parallel up to this limit
+MAX_CONCURRENT_EXTRACTIONS = 4
+
+
+def _read_url_lines(path: Path, max_lines: int = MAX_LINE_COUNT) -> Tuple[int, List[str]]:
+    """Return the number of lines in ``path`` and its non-empty sanitised lines.
+
+    The file is decoded and sanitised one line at a time, so only the
+    resulting URLs are kept in memory. Reading stops as soon as the count
+    exceeds ``max_lines``; callers reject the file in that case.
+    """
+    line_count = 0
+    urls: List[str] = []
+    with open(path, encoding="utf-8", errors="ignore", buffering=UPLOAD_READ_BUFFER) as f:
+        for raw in f:
+            line_count += 1
+            if line_count > max_lines:
+                break
+            line = raw.strip()
+            if not line:
+                continue
+            url = validators.sanitize_url(line)
+            if url:
+                urls.append(url)
+    return line_count, urls
+
+
+async def _expand_playlists(message, playlist_urls: List[str], max_videos: int) -> List[str]:
+    """Extract the video URLs of several playlists concurrently.
+
+    Progress is reported in one message per batch; only playlists that
+    fail or come back empty get a message of their own.
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_EXTRACTIONS)
+
+    async def extract(url: str) -> List[str]:
+        async with semaphore:
+            return await extract_playlist_urls(url, max_videos=max_videos)
+
+    await message.reply_text(f"🎵 Detected {len(playlist_urls)} playlist(s), extracting videos...")
+    results = await asyncio.gather(*(extract(url) for url in playlist_urls), return_exceptions=True)
+
+    video_urls: List[str] = []
+    found = 0
+    for url, result in zip(playlist_urls, results):
+        if isinstance(result, Exception):
+            await message.reply_text(f"❌ Error processing playlist {url[:50]}...: {str(result)}")
+        elif not result:
+            await message.reply_text(f"❌ Could not extract videos from playlist: {url[:50]}...")
+        else:
+            found += len(result)
+            video_urls.extend(v for v in result if validators.is_valid_url(v))
+    if found:
+        await message.reply_text(f"📋 Found {found} videos in {len(playlist_urls)} playlist(s)")
+    return video_urls
 
 
 async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -32,6 +91,7 @@ async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
     if message is None or not message.text:
         return
     queue_manager = context.bot_data.get("queue_manager")
+    config = context.bot_data.get("config")
     if queue_manager is None:
         await update.message.reply_text("Queue manager unavailable.")
         return
@@ -41,45 +101,24 @@ async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
         return
     urls = [validators.sanitize_url(url) for url in urls]
     added_ids: List[int] = []
-    duplicate_ids: List[int] = []
     total_videos = 0
-    total_duplicates = 0
-
-    for url in urls:
-        if not validators.is_valid_url(url):
-            continue
-
-        # Check if this is a playlist URL
-        if is_playlist_url(url):
-            config = context.bot_data.get("config", None)
-            max_videos = config.max_playlist_videos if config else 10
-            await update.message.reply_text(f"🎵 Detected playlist URL, extracting videos from: {url[:50]}...")
-            try:
-                video_urls = await extract_playlist_urls(url, max_videos=max_videos)
-                if video_urls:
-                    await update.message.reply_text(f"📋 Found {len(video_urls)} videos in playlist")
-                    for video_url in video_urls:
-                        if validators.is_valid_url(video_url):
-                            task_id, is_new = await queue_manager.add_task(video_url)
-                            if is_new:
-                                added_ids.append(task_id)
-                                total_videos += 1
-                            else:
-                                duplicate_ids.append(task_id)
-                                total_duplicates += 1
-                else:
-                    await update.message.reply_text(f"❌ Could not extract videos from playlist: {url[:50]}...")
-            except Exception as e:
-                await update.message.reply_text(f"❌ Error processing playlist {url[:50]}...: {str(e)}")
+    # Repeats within the message are counted here and never reach the queue
+    valid_urls = [url for url in urls if validators.is_valid_url(url)]
+    unique_urls = list(dict.fromkeys(valid_urls))
+    total_duplicates = len(valid_urls) - len(unique_urls)
+
+    playlist_urls = [url for url in unique_urls if is_playlist_url(url)]
+    to_add = [url for url in unique_urls if not is_playlist_url(url)]
+    if playlist_urls:
+        max_videos = config.max_playlist_videos if config else 10
+        to_add.extend(await _expand_playlists(update.message, playlist_urls, max_videos))
+
+    for task_id, is_new in await queue_manager.add_tasks(to_add):
+        if is_new:
+            added_ids.append(task_id)
+            total_videos += 1
         else:
-            # Regular video URL
-            task_id, is_new = await queue_manager.add_task(url)
-            if is_new:
-                added_ids.append(task_id)
-                total_videos += 1
-            else:
-                duplicate_ids.append(task_id)
-                total_duplicates += 1
+            total_duplicates += 1
 
     # Build response message
     response_parts = []
@@ -89,7 +128,7 @@ async def handle_text(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
         else:
             response_parts.append(f"📥 Added {len(added_ids)} new task(s)")
 
-    if duplicate_ids:
+    if total_duplicates:
         response_parts.append(f"♻️ Skipped {total_duplicates} duplicate(s)")
 
     if response_parts:
@@ -130,23 +169,8 @@ async def handle_document(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             file = await document.get_file()
             data: bytearray = await file.download_as_bytearray()
 
-            # Save to temporary file first
-            with tempfile.NamedTemporaryFile(mode='wb', suffix='.txt', delete=False) as tmp:
-                tmp.write(data)
-                tmp_path = tmp.name
-
-            # Append cookies from temp file to main cookies file
-            success, message_text = CookieManager.append_cookies(
-                Path(config.cookies_file),
-                Path(tmp_path)
-            )
-
-            # Clean up temp file
-            import os
-            try:
-                os.unlink(tmp_path)
-            except:
-                pass
+            # Merge straight from the downloaded bytes into the main cookies file
+            success, message_text = CookieManager.append_cookies_from_bytes(config.cookies_path, data)
 
             if success:
                 await update.message.reply_text(f"✅ {message_text}")
@@ -154,7 +178,7 @@ async def handle_document(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             else:
                 await update.message.reply_text(f"❌ Failed to append cookies: {message_text}")
                 logger.error(f"Failed to append cookies: {message_text}")
-        except Exception as e:
+        except (TelegramError, OSError) as e:
             await update.message.reply_text(f"❌ Error processing cookie file: {str(e)}")
             logger.error(f"Error processing cookie file: {e}")
         return
@@ -163,64 +187,48 @@ async def handle_document(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     if queue_manager is None:
         await update.message.reply_text("Queue manager unavailable.")
         return
-    # Download the file contents into memory
+    # Download to a temporary file and read it back line by line
     try:
         file = await document.get_file()
-        data: bytearray = await file.download_as_bytearray()
-        content = data.decode('utf-8', errors='ignore')
-    except Exception:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_path = Path(tmp_dir) / "urls.txt"
+            await file.download_to_drive(tmp_path)
+            # Decoding and sanitising up to MAX_LINE_COUNT lines stays off the event loop
+            line_count, lines = await asyncio.to_thread(_read_url_lines, tmp_path)
+    except (TelegramError, OSError) as exc:
+        logger.warning(f"Failed to fetch uploaded URL list: {exc}")
         await update.message.reply_text("Failed to download the file. Please try again.")
         return
-    lines = [line.strip() for line in content.splitlines()]
-    
-    if len(lines) > MAX_LINE_COUNT:
+
+    if line_count > MAX_LINE_COUNT:
         await update.message.reply_text(f"❌ File has too many lines. Maximum is {MAX_LINE_COUNT} lines.")
-        logger.warning(f"User attempted to upload file with {len(lines)} lines (max: {MAX_LINE_COUNT})")
+        logger.warning(f"User attempted to upload file with more than {MAX_LINE_COUNT} lines")
         return
-    
-    lines = [validators.sanitize_url(line) for line in lines]
+
     added = 0
-    duplicates = 0
     total_videos = 0
-
-    for line in lines:
-        if not validators.is_valid_url(line):
-            continue
-
-        # Check if this is a playlist URL
-        if is_playlist_url(line):
-            config = context.bot_data.get("config", None)
-            max_videos = config.max_playlist_videos if config else 10
-            await update.message.reply_text(f"🎵 Processing playlist from file: {line[:50]}...")
-            try:
-                video_urls = await extract_playlist_urls(line, max_videos=max_videos)
-                if video_urls:
-                    await update.message.reply_text(f"📋 Found {len(video_urls)} videos in playlist")
-                    for video_url in video_urls:
-                        if validators.is_valid_url(video_url):
-                            _, is_new = await queue_manager.add_task(video_url)
-                            if is_new:
-                                added += 1
-                                total_videos += 1
-                            else:
-                                duplicates += 1
-                else:
-                    await update.message.reply_text(f"❌ Could not extract videos from playlist: {line[:50]}...")
-            except Exception as e:
-                await update.message.reply_text(f"❌ Error processing playlist {line[:50]}...: {str(e)}")
+    # Repeated lines are counted here and never reach the queue
+    valid_lines = [line for line in lines if validators.is_valid_url(line)]
+    unique_lines = list(dict.fromkeys(valid_lines))
+    duplicates = len(valid_lines) - len(unique_lines)
+
+    playlist_urls = [line for line in unique_lines if is_playlist_url(line)]
+    to_add = [line for line in unique_lines if not is_playlist_url(line)]
+    if playlist_urls:
+        max_videos = config.max_playlist_videos if config else 10
+        to_add.extend(await _expand_playlists(update.message, playlist_urls, max_videos))
+
+    for _, is_new in await queue_manager.add_tasks(to_add):
+        if is_new:
+            added += 1
+            total_videos += 1
         else:
-            # Regular video URL
-            _, is_new = await queue_manager.add_task(line)
-            if is_new:
-                added += 1
-                total_videos += 1
-            else:
-                duplicates += 1
+            duplicates += 1
 
     # Build response message
     response_parts = []
     if added:
-        if total_videos > len([l for l in lines if l.strip()]):
+        if total_videos > len(lines):
             response_parts.append(f"📥 Added {total_videos} new video(s) (expanded from file)")
         else:
             response_parts.append(f"📥 Added {added} new task(s) from file")
@@ -8,15 +8,34 @@ restarts and supports retrying failed tasks with exponential backoff.
 from __future__ import annotations
 
 import asyncio
+import os
+import sqlite3
 import time
+from contextlib import asynccontextmanager, suppress
 from dataclasses import dataclass
-from typing import Optional, List, Tuple
+from typing import AsyncIterator, NamedTuple, Optional, List, Tuple
+from urllib.request import pathname2url
 
 import aiosqlite
 
+from .utils.bloom import BloomFilter
+from .utils.db import SQLITE_PRAGMAS
 from .utils.logger import get_logger
 from .utils.deduplication import normalize_url, compute_url_hash, extract_video_id
 
+# Connections kept open for reuse; enough for the workers plus the handlers
+POOL_SIZE = 8
+READ_POOL_SIZE = 4
+# Values per IN (...) lookup; a power of two so padded chunks never exceed it
+IN_CHUNK_SIZE = 512
+# Minimum number of URL hashes and video ids the known-keys filter is sized for
+KNOWN_KEYS_CAPACITY = 100_000
+
+# journal_mode is a property of the file and cannot be set read-only
+_READ_ONLY_PRAGMAS = tuple(
+    pragma for pragma in SQLITE_PRAGMAS if "journal_mode" not in pragma
+) + ("PRAGMA query_only=1",)
+
 
 @dataclass
 class DownloadTask:
@@ -36,6 +55,120 @@ class DownloadTask:
     download_method: str = "auto"
 
 
+class FailedTask(NamedTuple):
+    """Read-only summary of a failed task for status displays."""
+
+    id: int
+    url: str
+    error_message: Optional[str]
+
+
+class PendingTask(NamedTuple):
+    """Read-only summary of a pending task for queue listings."""
+
+    id: int
+    url: str
+    attempts: int
+
+
+class _ConnectionPool:
+    """aiosqlite connections kept open for reuse, opened on demand up to ``size``."""
+
+    def __init__(self, database: str, size: int, pragmas: Tuple[str, ...], uri: bool = False):
+        self.database = database
+        self.size = size
+        self.pragmas = pragmas
+        self.uri = uri
+        # None entries are wake-ups: a slot was freed or the pool closed
+        self._idle: asyncio.Queue[Optional[aiosqlite.Connection]] = asyncio.Queue()
+        self._connections: List[aiosqlite.Connection] = []
+        self._opened = 0
+        self._waiters = 0
+        self._closed = False
+
+    async def _open(self) -> aiosqlite.Connection:
+        # Reserve the slot before awaiting so concurrent callers respect size
+        self._opened += 1
+        try:
+            conn = await aiosqlite.connect(self.database, uri=self.uri)
+            # Applied once per pooled connection rather than per operation
+            for pragma in self.pragmas:
+                await conn.execute(pragma)
+        except BaseException:
+            self._opened -= 1
+            raise
+        self._connections.append(conn)
+        return conn
+
+    def _wake_waiters(self, count: int) -> None:
+        for _ in range(min(count, self._waiters)):
+            self._idle.put_nowait(None)
+
+    async def _acquire(self) -> aiosqlite.Connection:
+        while True:
+            if self._closed:
+                raise RuntimeError("Connection pool is closed")
+            if not self._idle.empty():
+                conn = self._idle.get_nowait()
+            elif self._opened < self.size:
+                return await self._open()
+            else:
+                self._waiters += 1
+                try:
+                    conn = await self._idle.get()
+                finally:
+                    self._waiters -= 1
+            if conn is not None:
+                return conn
+
+    async def _discard(self, conn: aiosqlite.Connection) -> None:
+        # Free the slot first so a waiter can open a replacement
+        self._connections.remove(conn)
+        self._opened -= 1
+        self._wake_waiters(1)
+        with suppress(Exception):
+            await conn.close()
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Borrow a connection for one operation."""
+        conn = await self._acquire()
+        try:
+            yield conn
+        finally:
+            if self._closed:
+                # The pool closed while this connection was out; closing it
+                # discards any unfinished transaction
+                self._connections.remove(conn)
+                await conn.close()
+            else:
+                # Never hand out a connection with a half-finished transaction
+                try:
+                    if conn.in_transaction:
+                        await conn.rollback()
+                except BaseException:
+                    await self._discard(conn)
+                    raise
+                self._idle.put_nowait(conn)
+
+    async def close(self) -> None:
+        """Close idle connections and refuse further borrows.
+
+        Borrowers still waiting for a connection get a RuntimeError;
+        connections still borrowed are closed when they are returned.
+        """
+        self._closed = True
+        idle = []
+        while not self._idle.empty():
+            conn = self._idle.get_nowait()
+            if conn is not None:
+                idle.append(conn)
+        self._wake_waiters(self._waiters)
+        for conn in idle:
+            self._connections.remove(conn)
+            await conn.close()
+
+
 class QueueManager:
     """Manage persistent download tasks using SQLite.
 
@@ -54,13 +187,33 @@ class QueueManager:
         self.db_path = db_path
         self.max_retries = max_retries
         self.base_delay = base_delay
-        # Lock to prevent concurrent selection of the same task by multiple workers
+        # Serialises task selection when SQLite lacks UPDATE ... RETURNING
         self._lock = asyncio.Lock()
         self.logger = get_logger(self.__class__.__name__)
+        self._pool = _ConnectionPool(db_path, POOL_SIZE, SQLITE_PRAGMAS)
+        # Listing and duplicate lookups never write; a separate read-only
+        # pool keeps them from queueing behind writers for a connection
+        read_uri = f"file:{pathname2url(os.path.abspath(db_path))}?mode=ro"
+        self._read_pool = _ConnectionPool(read_uri, READ_POOL_SIZE, _READ_ONLY_PRAGMAS, uri=True)
+        # URL hashes and video ids of every stored task; None until initialize()
+        self._known: Optional[BloomFilter] = None
+
+    def _connect(self):
+        """Borrow a pooled read-write connection for one operation."""
+        return self._pool.connection()
+
+    def _read(self):
+        """Borrow a pooled read-only connection for one query."""
+        return self._read_pool.connection()
+
+    async def close(self) -> None:
+        """Close all pooled connections."""
+        await self._read_pool.close()
+        await self._pool.close()
 
     async def initialize(self) -> None:
         """Initialize the database and reset tasks stuck in processing state."""
-        async with aiosqlite.connect(self.db_path) as conn:
+        async with self._connect() as conn:
             await conn.execute(
                 """
                 CREATE TABLE IF NOT EXISTS tasks (
@@ -81,29 +234,31 @@ class QueueManager:
             )
             await conn.commit()
 
-            # Add new columns if they don't exist (for existing databases)
-            try:
-                await conn.execute("ALTER TABLE tasks ADD COLUMN url_hash TEXT")
-                await conn.commit()
-            except:
-                pass  # Column already exists
-
-            try:
-                await conn.execute("ALTER TABLE tasks ADD COLUMN video_id TEXT")
-                await conn.commit()
-            except:
-                pass  # Column already exists
-
-            try:
-                await conn.execute("ALTER TABLE tasks ADD COLUMN download_method TEXT NOT NULL DEFAULT 'auto'")
-                await conn.commit()
-            except:
-                pass  # Column already exists
-
-            # Create indices for fast duplicate detection
-            await conn.execute("CREATE INDEX IF NOT EXISTS idx_url_hash ON tasks(url_hash)")
-            await conn.execute("CREATE INDEX IF NOT EXISTS idx_video_id ON tasks(video_id)")
-            await conn.execute("CREATE INDEX IF NOT EXISTS idx_status ON tasks(status)")
+            # Add columns missing from databases created before they existed
+            cursor = await conn.execute("PRAGMA table_info(tasks)")
+            columns = {row[1] for row in await cursor.fetchall()}
+            for column, definition in (
+                ("url_hash", "TEXT"),
+                ("video_id", "TEXT"),
+                ("download_method", "TEXT NOT NULL DEFAULT 'auto'"),
+            ):
+                if column not in columns:
+                    await conn.execute(f"ALTER TABLE tasks ADD COLUMN {column} {definition}")
+
+            # Duplicate lookups filter on status too; with it in the index
+            # (and the rowid implied) they never touch the table rows
+            await conn.execute("CREATE INDEX IF NOT EXISTS idx_url_hash_status ON tasks(url_hash, status)")
+            await conn.execute("CREATE INDEX IF NOT EXISTS idx_video_id_status ON tasks(video_id, status)")
+            await conn.execute("DROP INDEX IF EXISTS idx_url_hash")
+            await conn.execute("DROP INDEX IF EXISTS idx_video_id")
+            # fetch_next_task walks pending tasks in id order and checks
+            # next_attempt_at in the index itself, so no sort is needed; the
+            # status prefix also serves the per-status counts
+            await conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_pending_ready ON tasks(status, id, next_attempt_at)"
+            )
+            await conn.execute("DROP INDEX IF EXISTS idx_status")
+            await conn.execute("DROP INDEX IF EXISTS idx_status_next_attempt")
             await conn.commit()
 
             # Reset tasks that were in processing state when the bot crashed
@@ -112,6 +267,27 @@ class QueueManager:
             )
             await conn.commit()
 
+            cursor = await conn.execute("SELECT COUNT(*) FROM tasks")
+            (count,) = await cursor.fetchone()
+            known = BloomFilter(max(KNOWN_KEYS_CAPACITY, 4 * count))
+            async with conn.execute("SELECT url_hash, video_id FROM tasks") as cursor:
+                async for url_hash, video_id in cursor:
+                    if url_hash:
+                        known.add(url_hash)
+                    if video_id:
+                        known.add(video_id)
+            self._known = known
+
+    def _may_know(self, key: str) -> bool:
+        """Return False only if no stored task has ``key`` as URL hash or video id."""
+        return self._known is None or key in self._known
+
+    def _remember(self, url_hash: str, video_id: Optional[str]) -> None:
+        if self._known is not None:
+            self._known.add(url_hash)
+            if video_id:
+                self._known.add(video_id)
+
     async def check_duplicate(self, url: str) -> Tuple[bool, Optional[DownloadTask]]:
         """Check if a URL is a duplicate of an existing task.
 
@@ -127,8 +303,11 @@ class QueueManager:
         """
         url_hash = compute_url_hash(url)
         video_id = extract_video_id(url)
+        # First-time URLs, the common case, are settled without a query
+        if not self._may_know(url_hash) and not (video_id and self._may_know(video_id)):
+            return False, None
 
-        async with aiosqlite.connect(self.db_path) as conn:
+        async with self._read() as conn:
             # Check by URL hash first (most reliable)
             cursor = await conn.execute(
                 """
@@ -182,35 +361,194 @@ class QueueManager:
             (task_id, is_new) - is_new is False if it was a duplicate
         """
         download_method = download_method if download_method else "auto"
-        # Check for duplicates first
-        if not skip_duplicate_check:
-            is_dup, existing_task = await self.check_duplicate(url)
-            if is_dup:
-                self.logger.info(f"Skipping duplicate URL: {url[:50]}... (existing task: {existing_task.id})")
-                return existing_task.id, False
-
-        # Compute hash and video ID for new task
         url_hash = compute_url_hash(url)
         video_id = extract_video_id(url)
-
         now = time.time()
-        async with aiosqlite.connect(self.db_path) as conn:
+        row = (url, now, now, url_hash, video_id, download_method)
+
+        async with self._connect() as conn:
+            if skip_duplicate_check:
+                cursor = await conn.execute(
+                    """
+                    INSERT INTO tasks (url, status, attempts, added_at, updated_at, url_hash, video_id, download_method)
+                    VALUES (?, 'pending', 0, ?, ?, ?, ?, ?)
+                    """,
+                    row,
+                )
+            else:
+                # Dedup and insert in one statement, so concurrent adds of
+                # the same URL cannot both get through
+                cursor = await conn.execute(
+                    """
+                    INSERT INTO tasks (url, status, attempts, added_at, updated_at, url_hash, video_id, download_method)
+                    SELECT ?, 'pending', 0, ?, ?, ?, ?, ?
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM tasks
+                        WHERE (url_hash = ? OR video_id = ?) AND status IN ('pending', 'processing', 'completed')
+                    )
+                    """,
+                    row + (url_hash, video_id),
+                )
+            if cursor.rowcount == 1:
+                # Remember the keys while the write lock is still held, so a
+                # writer that goes next never consults a stale filter
+                self._remember(url_hash, video_id)
+                await conn.commit()
+                task_id = cursor.lastrowid
+                self.logger.info(f"Added new task {task_id}: {url[:50]}... (hash: {url_hash[:8]}, video_id: {video_id})")
+                return task_id, True
+
+            # Duplicate: still inside the INSERT's transaction, so the match
+            # it saw is there; report the newest, preferring the URL hash
             cursor = await conn.execute(
                 """
-                INSERT INTO tasks (url, status, attempts, added_at, updated_at, url_hash, video_id, download_method)
-                VALUES (?, 'pending', 0, ?, ?, ?, ?, ?)
+                SELECT id FROM tasks
+                WHERE (url_hash = ? OR video_id = ?) AND status IN ('pending', 'processing', 'completed')
+                ORDER BY url_hash = ? DESC, id DESC
+                LIMIT 1
                 """,
-                (url, now, now, url_hash, video_id, download_method),
+                (url_hash, video_id, url_hash),
+            )
+            (task_id,) = await cursor.fetchone()
+            await conn.commit()
+            self.logger.info(f"Skipping duplicate URL: {url[:50]}... (existing task: {task_id})")
+            return task_id, False
+
+    async def add_tasks(self, urls: List[str], download_method: str = "auto") -> List[Tuple[int, bool]]:
+        """Add several tasks in one transaction.
+
+        Duplicates are detected the same way as in :meth:`add_task`, both
+        against existing tasks and within ``urls`` itself.
+
+        Returns
+        -------
+        List[Tuple[int, bool]]
+            ``(task_id, is_new)`` for each URL, in input order.
+        """
+        download_method = download_method if download_method else "auto"
+        if not urls:
+            return []
+        keys = [(url, compute_url_hash(url), extract_video_id(url)) for url in urls]
+        now = time.time()
+        async with self._connect() as conn:
+            # Take the write lock up front so ids allocated below are ours alone
+            await conn.execute("BEGIN IMMEDIATE")
+            by_hash, by_video = await self._find_existing(
+                conn,
+                list({h for _, h, _ in keys if self._may_know(h)}),
+                list({v for _, _, v in keys if v and self._may_know(v)}),
             )
+
+            # Each entry is (task_id, is_new), or the index of an earlier new URL
+            results: list = []
+            new_rows = []
+            new_positions = []
+            for url, url_hash, video_id in keys:
+                existing = by_hash.get(url_hash)
+                if existing is None and video_id:
+                    existing = by_video.get(video_id)
+                if existing is not None:
+                    results.append(existing)
+                    continue
+                # Placeholder until the id is known; later repeats point at it
+                marker = len(results)
+                by_hash[url_hash] = marker
+                if video_id:
+                    by_video[video_id] = marker
+                results.append(marker)
+                new_positions.append(marker)
+                new_rows.append((url, now, now, url_hash, video_id, download_method))
+
+            if new_rows:
+                cursor = await conn.execute("SELECT COALESCE(MAX(id), 0) FROM tasks")
+                (last_id,) = await cursor.fetchone()
+                await conn.executemany(
+                    """
+                    INSERT INTO tasks (url, status, attempts, added_at, updated_at, url_hash, video_id, download_method)
+                    VALUES (?, 'pending', 0, ?, ?, ?, ?, ?)
+                    """,
+                    new_rows,
+                )
+                cursor = await conn.execute("SELECT id FROM tasks WHERE id > ? ORDER BY id", (last_id,))
+                new_ids = [row[0] for row in await cursor.fetchall()]
+                for pos, task_id in zip(new_positions, new_ids):
+                    results[pos] = (task_id, True)
+                # Before the commit releases the write lock; should the commit
+                # fail, the extra keys only cost a false positive
+                for _, _, _, url_hash, video_id, _ in new_rows:
+                    self._remember(url_hash, video_id)
             await conn.commit()
-            task_id = cursor.lastrowid
-            self.logger.info(f"Added new task {task_id}: {url[:50]}... (hash: {url_hash[:8]}, video_id: {video_id})")
-            return task_id, True
+
+        out: List[Tuple[int, bool]] = []
+        for result in results:
+            if isinstance(result, int):
+                # In-batch repeat of a URL inserted above
+                result = (results[result][0], False)
+            out.append(result)
+        self.logger.info(f"Added {len(new_rows)} new task(s) from a batch of {len(urls)}")
+        return out
+
+    async def _find_existing(
+        self, conn, url_hashes: List[str], video_ids: List[str]
+    ) -> Tuple[dict, dict]:
+        """Map URL hashes and video ids to ``(task_id, False)`` for live tasks.
+
+        Mirrors :meth:`check_duplicate`: the newest matching task wins.
+        """
+        by_hash: dict = {}
+        by_video: dict = {}
+        for column, values, found in (("url_hash", url_hashes, by_hash), ("video_id", video_ids, by_video)):
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(values), IN_CHUNK_SIZE):
+                chunk = values[start:start + IN_CHUNK_SIZE]
+                # Pad to a power of two by repeating the last value, so only
+                # a handful of distinct statements reach the statement cache
+                size = 1 << (len(chunk) - 1).bit_length()
+                chunk += chunk[-1:] * (size - len(chunk))
+                placeholders = ",".join("?" * size)
+                cursor = await conn.execute(
+                    f"""
+                    SELECT {column}, MAX(id)
+                    FROM tasks
+                    WHERE {column} IN ({placeholders}) AND status IN ('pending', 'processing', 'completed')
+                    GROUP BY {column}
+                    """,
+                    chunk,
+                )
+                for value, task_id in await cursor.fetchall():
+                    found[value] = (task_id, False)
+        return by_hash, by_video
+
+    async def _claim_next_row(self, conn) -> Optional[DownloadTask]:
+        """Select the next eligible task and mark it as processing in one statement.
+
+        The UPDATE is atomic, so concurrent workers cannot claim the same
+        task and no asyncio lock is needed. Requires SQLite 3.35+.
+        """
+        now = time.time()
+        cursor = await conn.execute(
+            """
+            UPDATE tasks SET status='processing', updated_at=?1
+            WHERE id = (
+                SELECT id FROM tasks
+                WHERE status='pending'
+                  AND (next_attempt_at IS NULL OR next_attempt_at <= ?1)
+                ORDER BY id ASC
+                LIMIT 1
+            )
+            RETURNING id, url, status, attempts, added_at, updated_at, next_attempt_at, file_path, error_message, url_hash, video_id, download_method
+            """,
+            (now,),
+        )
+        row = await cursor.fetchone()
+        await conn.commit()
+        return DownloadTask(*row) if row else None
 
     async def _fetch_next_row(self, conn) -> Optional[DownloadTask]:
         """Select the next eligible task and mark it as processing.
 
-        This helper must be called with the queue manager's lock held.
+        Fallback for SQLite without RETURNING; this helper must be called
+        with the queue manager's lock held.
         """
         now = time.time()
         # Find the next task that is pending and ready for another attempt
@@ -244,17 +582,21 @@ class QueueManager:
 
         Returns ``None`` if there are no pending tasks ready for processing.
         """
-        async with self._lock:
-            async with aiosqlite.connect(self.db_path) as conn:
-                task = await self._fetch_next_row(conn)
-                if task:
-                    self.logger.debug(f"Fetched task {task.id}: {task.url} (status: {task.status})")
-                return task
+        if sqlite3.sqlite_version_info >= (3, 35, 0):
+            async with self._connect() as conn:
+                task = await self._claim_next_row(conn)
+        else:
+            async with self._lock:
+                async with self._connect() as conn:
+                    task = await self._fetch_next_row(conn)
+        if task:
+            self.logger.debug(f"Fetched task {task.id}: {task.url} (status: {task.status})")
+        return task
 
     async def mark_completed(self, task_id: int, file_path: str) -> None:
         """Mark a task as completed and record the output file path."""
         now = time.time()
-        async with aiosqlite.connect(self.db_path) as conn:
+        async with self._connect() as conn:
             await conn.execute(
                 "UPDATE tasks SET status='completed', file_path=?, updated_at=? WHERE id=?",
                 (file_path, now, task_id),
@@ -264,7 +606,7 @@ class QueueManager:
     async def mark_failed(self, task_id: int, error_message: str) -> None:
         """Mark a task as failed (no more retries)."""
         now = time.time()
-        async with aiosqlite.connect(self.db_path) as conn:
+        async with self._connect() as conn:
             await conn.execute(
                 "UPDATE tasks SET status='failed', error_message=?, updated_at=? WHERE id=?",
                 (error_message, now, task_id),
@@ -277,7 +619,7 @@ class QueueManager:
         delay = (2 ** attempts) * self.base_delay
         next_time = time.time() + delay
         now = time.time()
-        async with aiosqlite.connect(self.db_path) as conn:
+        async with self._connect() as conn:
             await conn.execute(
                 """
                 UPDATE tasks
@@ -293,25 +635,56 @@ class QueueManager:
 
     async def get_pending_tasks(self) -> List[DownloadTask]:
         """Return a list of tasks currently in the pending state."""
-        async with aiosqlite.connect(self.db_path) as conn:
+        async with self._read() as conn:
             cursor = await conn.execute(
                 """SELECT id, url, status, attempts, added_at, updated_at, next_attempt_at, file_path, error_message, url_hash, video_id, download_method FROM tasks WHERE status='pending' ORDER BY id"""
             )
             rows = await cursor.fetchall()
             return [DownloadTask(*row) for row in rows]
 
+    async def get_pending_preview(self, limit: int = 10) -> Tuple[List[PendingTask], int]:
+        """Return the first ``limit`` pending tasks and the total pending count."""
+        async with self._read() as conn:
+            cursor = await conn.execute(
+                "SELECT id, url, attempts FROM tasks WHERE status='pending' ORDER BY id LIMIT ?",
+                (limit,),
+            )
+            tasks = [PendingTask(*row) for row in await cursor.fetchall()]
+            if len(tasks) < limit:
+                return tasks, len(tasks)
+            cursor = await conn.execute("SELECT COUNT(*) FROM tasks WHERE status='pending'")
+            (total,) = await cursor.fetchone()
+            return tasks, total
+
     async def get_processing_tasks(self) -> List[DownloadTask]:
         """Return a list of tasks currently in the processing state."""
-        async with aiosqlite.connect(self.db_path) as conn:
+        async with self._read() as conn:
             cursor = await conn.execute(
                 """SELECT id, url, status, attempts, added_at, updated_at, next_attempt_at, file_path, error_message, url_hash, video_id, download_method FROM tasks WHERE status='processing' ORDER BY id"""
             )
             rows = await cursor.fetchall()
             return [DownloadTask(*row) for row in rows]
 
+    async def get_recent_failed(self, window: float, limit: int) -> List[FailedTask]:
+        """Return up to ``limit`` tasks that failed within the last ``window`` seconds."""
+        since = time.time() - window
+        async with self._read() as conn:
+            cursor = await conn.execute(
+                """
+                SELECT id, url, error_message
+                FROM tasks
+                WHERE status='failed' AND updated_at > ?
+                ORDER BY updated_at DESC, id DESC
+                LIMIT ?
+                """,
+                (since, limit),
+            )
+            rows = await cursor.fetchall()
+            return [FailedTask(*row) for row in rows]
+
     async def clear_failed_tasks(self) -> None:
         """Remove tasks that have permanently failed from the database."""
-        async with aiosqlite.connect(self.db_path) as conn:
+        async with self._connect() as conn:
             await conn.execute("DELETE FROM tasks WHERE status='failed'")
             await conn.commit()
 
@@ -324,7 +697,7 @@ class QueueManager:
             Number of tasks reset
         """
         now = time.time()
-        async with aiosqlite.connect(self.db_path) as conn:
+        async with self._connect() as conn:
             # Count failed tasks
             cursor = await conn.execute("SELECT COUNT(*) FROM tasks WHERE status='failed'")
             result = await cursor.fetchone()
@@ -351,7 +724,7 @@ class QueueManager:
 
     async def count_by_status(self, status: str) -> int:
         """Return the number of tasks with the given status."""
-        async with aiosqlite.connect(self.db_path) as conn:
+        async with self._read() as conn:
             cursor = await conn.execute(
                 "SELECT COUNT(*) FROM tasks WHERE status=?", (status,)
             )
@@ -0,0 +1,51 @@
+"""In-memory Bloom filter for the Enhanced AutoDL Telegram Bot.
+
+The queue uses it to answer "definitely not seen" for URL hashes and
+video ids without a database query. A Bloom filter never reports a
+false negative, so a miss is authoritative; a hit only means the
+database has to be asked.
+"""
+
+from __future__ import annotations
+
+import math
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings.
+
+    Bit positions come from Python's built-in ``hash``, which is salted
+    per process. That is fine here because the filter is rebuilt from
+    the database on every start and never persisted.
+
+    Parameters
+    ----------
+    capacity: int
+        Expected number of keys. Adding more keeps lookups correct but
+        raises the false-positive rate.
+    error_rate: float, optional
+        Target false-positive rate at ``capacity`` keys.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(1, capacity)
+        self.num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, key: str):
+        # Double hashing: two 32-bit halves of one hash stand in for k hashes
+        h = hash(key) & 0xFFFFFFFFFFFFFFFF
+        h1 = h & 0xFFFFFFFF
+        h2 = (h >> 32) | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key: str) -> None:
+        """Record ``key`` in the filter."""
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: str) -> bool:
+        bits = self._bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
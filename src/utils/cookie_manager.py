@@ -4,18 +4,32 @@ Handles reading, merging, and appending cookies in Netscape format.
 """
 
 import os
+import tempfile
 from pathlib import Path
-from typing import Optional, Set, Tuple
+from typing import Dict, Optional, Set, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+_BOOL_VALUES = frozenset(("TRUE", "FALSE"))
+
 
 class CookieManager:
     """Manages Netscape format cookies for yt-dlp."""
 
     NETSCAPE_HEADER = "# Netscape HTTP Cookie File\n# https://curl.haxx.se/rfc/cookie_spec.html\n# This is a generated file! Do not edit.\n\n"
 
+    # Parsed cookies per path, valid while (st_mtime_ns, st_size) is unchanged
+    _cache: Dict[str, Tuple[Tuple[int, int], dict]] = {}
+
+    @staticmethod
+    def _file_stamp(file_path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            st = file_path.stat()
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
     @staticmethod
     def _parse_cookie_line(line: str) -> Optional[Tuple[str, str, str, str, str, str, str]]:
         """
@@ -24,37 +38,37 @@ class CookieManager:
         Returns tuple of (domain, flag, path, secure, expiration, name, value) or None if invalid.
         """
         line = line.strip()
-        if not line or line.startswith("#"):
+        if not line or line[0] == "#":
             return None
 
         parts = line.split("\t")
+        # Fast path: a well-formed line passes one combined check
+        if len(parts) == 7:
+            domain, flag, _, secure, expiration, name, _ = parts
+            if (domain and not domain.startswith(" ") and flag in _BOOL_VALUES and secure in _BOOL_VALUES
+                    and expiration.isdigit() and name.strip()):
+                return tuple(parts)
+        CookieManager._log_invalid_cookie(parts)
+        return None
+
+    @staticmethod
+    def _log_invalid_cookie(parts: list) -> None:
+        """Log why a cookie line was rejected by _parse_cookie_line."""
         if len(parts) != 7:
             logger.warning(f"Invalid cookie line format: expected 7 tab-separated fields, got {len(parts)}")
-            return None
+            return
 
         domain, flag, path, secure, expiration, name, value = parts
-        
         if not domain or domain.startswith(" "):
             logger.warning(f"Invalid domain in cookie: '{domain}'")
-            return None
-        
-        if flag not in ("TRUE", "FALSE"):
+        elif flag not in _BOOL_VALUES:
             logger.warning(f"Invalid flag value in cookie: expected TRUE or FALSE, got '{flag}'")
-            return None
-        
-        if secure not in ("TRUE", "FALSE"):
+        elif secure not in _BOOL_VALUES:
             logger.warning(f"Invalid secure value in cookie: expected TRUE or FALSE, got '{secure}'")
-            return None
-        
-        if not expiration.isdigit():
+        elif not expiration.isdigit():
             logger.warning(f"Invalid expiration in cookie: expected numeric timestamp, got '{expiration}'")
-            return None
-        
-        if not name or not name.strip():
+        else:
             logger.warning(f"Invalid cookie name: empty or whitespace")
-            return None
-
-        return tuple(parts)
 
     @staticmethod
     def _get_cookie_key(cookie: Tuple) -> str:
@@ -70,25 +84,28 @@ class CookieManager:
         """
         Read cookies from a Netscape format file.
         Returns dict of {cookie_key: cookie_tuple}
+        Results are cached until the file's mtime or size changes.
         """
         cookies = {}
-        if not file_path.exists():
+        stamp = CookieManager._file_stamp(file_path)
+        if stamp is None:
             return cookies
+        cached = CookieManager._cache.get(str(file_path))
+        if cached is not None and cached[0] == stamp:
+            return dict(cached[1])
 
         try:
             with open(file_path, "r", encoding="utf-8") as f:
-                line_num = 0
-                for line in f:
-                    line_num += 1
-                    cookie = CookieManager._parse_cookie_line(line)
-                    if cookie:
-                        key = CookieManager._get_cookie_key(cookie)
-                        cookies[key] = cookie
-                logger.info(f"Successfully read {len(cookies)} valid cookies from {file_path} ({line_num} lines total)")
+                lines = f.readlines()
+            line_num = len(lines)
+            parsed = map(CookieManager._parse_cookie_line, lines)
+            cookies = {CookieManager._get_cookie_key(cookie): cookie for cookie in parsed if cookie}
+            logger.info(f"Successfully read {len(cookies)} valid cookies from {file_path} ({line_num} lines total)")
         except Exception as e:
             logger.error(f"Error reading cookies from {file_path}: {e}")
             raise
 
+        CookieManager._cache[str(file_path)] = (stamp, dict(cookies))
         return cookies
 
     @staticmethod
@@ -101,14 +118,23 @@ class CookieManager:
         try:
             file_path.parent.mkdir(parents=True, exist_ok=True)
 
-            with open(file_path, "w", encoding="utf-8") as f:
-                f.write(CookieManager.NETSCAPE_HEADER)
-                for cookie in sorted(cookies.values(), key=lambda c: c[0]):
-                    line = "\t".join(cookie) + "\n"
-                    f.write(line)
+            content = [CookieManager.NETSCAPE_HEADER]
+            content.extend("\t".join(cookie) + "\n" for cookie in sorted(cookies.values(), key=lambda c: c[0]))
+
+            # Write a 0600 temp file next to the jar in one call, then swap it in
+            # so yt-dlp never sees a half-written file
+            fd, tmp_path = tempfile.mkstemp(dir=file_path.parent, prefix=f".{file_path.name}.")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write("".join(content))
+                os.replace(tmp_path, file_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+
+            # The next read of this file can reuse what was just written
+            CookieManager._cache[str(file_path)] = (CookieManager._file_stamp(file_path), dict(cookies))
 
-            os.chmod(file_path, 0o600)
-            
             logger.info(f"Wrote {len(cookies)} cookies to {file_path} with secure permissions (0600)")
             return True
         except Exception as e:
@@ -139,17 +165,43 @@ class CookieManager:
             return False, msg
 
         try:
-            existing = CookieManager.read_cookies(main_file)
             new_cookies = CookieManager.read_cookies(source_file)
+        except Exception as e:
+            msg = f"Error appending cookies: {e}"
+            logger.error(msg)
+            return False, msg
+        return CookieManager._merge_into(main_file, new_cookies, str(source_file))
+
+    @staticmethod
+    def append_cookies_from_bytes(main_file: Path, data: bytes) -> Tuple[bool, str]:
+        """
+        Append cookies from raw Netscape-format bytes (e.g. an upload) to main_file.
+        Same merge rules as append_cookies, without a temporary file.
+        Returns (success: bool, message: str)
+        """
+        try:
+            parsed = map(CookieManager._parse_cookie_line, bytes(data).decode("utf-8").splitlines())
+            new_cookies = {CookieManager._get_cookie_key(cookie): cookie for cookie in parsed if cookie}
+        except UnicodeDecodeError as e:
+            msg = f"Error appending cookies: {e}"
+            logger.error(msg)
+            return False, msg
+        return CookieManager._merge_into(main_file, new_cookies, "uploaded file")
 
-            if not new_cookies:
-                msg = f"No valid cookies found in {source_file}"
-                logger.warning(msg)
-                return False, msg
+    @staticmethod
+    def _merge_into(main_file: Path, new_cookies: dict, source: str) -> Tuple[bool, str]:
+        """Merge parsed cookies into main_file and report what changed."""
+        if not new_cookies:
+            msg = f"No valid cookies found in {source}"
+            logger.warning(msg)
+            return False, msg
+
+        try:
+            existing = CookieManager.read_cookies(main_file)
 
             new_count = 0
             updated_count = 0
-            for key, cookie in new_cookies.items():
+            for key in new_cookies:
                 if key in existing:
                     updated_count += 1
                 else:
@@ -0,0 +1,35 @@
+"""SQLite connection tuning shared by the queue and maintenance scripts.
+
+The bot and the debugging tools open the same ``autodl.db`` file, so
+they apply the same PRAGMAs: WAL journaling lets readers run alongside
+the writer, and ``synchronous=NORMAL`` avoids an fsync per commit while
+remaining safe in WAL mode.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+)
+
+
+def open_db(db_path: str) -> sqlite3.Connection:
+    """Open a synchronous SQLite connection with the shared PRAGMAs applied."""
+    conn = sqlite3.connect(db_path)
+    for pragma in SQLITE_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def close_db(conn: sqlite3.Connection) -> None:
+    """Run ``PRAGMA optimize`` and close the connection."""
+    try:
+        conn.execute("PRAGMA optimize")
+    finally:
+        conn.close()
@@ -13,10 +13,42 @@ from __future__ import annotations
 import hashlib
 import os
 import re
+from functools import lru_cache
 from typing import Optional, Tuple
 from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
 
-
+# Query parameters that only track the referrer and never select content
+_TRACKING_PARAMS = frozenset({
+    'utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content',
+    'fbclid', 'gclid', 'ref', 'source', 'share'
+})
+
+# (host substrings, pattern, prefix) checked in order by extract_video_id
+_VIDEO_ID_RULES = (
+    (('pornhub.com',), re.compile(r'viewkey=([a-f0-9]+)', re.IGNORECASE), 'pornhub'),
+    (('xvideos.com',), re.compile(r'/video([0-9]+)/'), 'xvideos'),
+    (('xhamster.com',), re.compile(r'/videos/[^/]+-([0-9]+)'), 'xhamster'),
+    (('redtube.com',), re.compile(r'/([0-9]+)'), 'redtube'),
+    (('twitter.com', 'x.com'), re.compile(r'/status/([0-9]+)'), 'twitter'),
+    (('reddit.com',), re.compile(r'/comments/([a-z0-9]+)'), 'reddit'),
+    (('spankbang.com',), re.compile(r'/([a-z0-9]+)/video/'), 'spankbang'),
+    (('onlyfans.com',), re.compile(r'/([0-9]+)/'), 'onlyfans'),
+)
+
+# Query strings made only of these characters decode and re-encode unchanged
+_PLAIN_QUERY_RE = re.compile(r'[A-Za-z0-9_.~&=-]*')
+
+# Quality and resolution markers stripped from filenames before comparison
+_FILENAME_MARKER_RE = re.compile(
+    r'[-_\s]*(?:1080p|720p|480p|360p|4k|hd|sd|uhd|\d{3,4}x\d{3,4})[-_\s]*', re.IGNORECASE
+)
+_NON_ALNUM_RE = re.compile(r'[^a-z0-9]+')
+
+# The same URL goes through duplicate checks and insertion in quick succession
+URL_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
 def normalize_url(url: str) -> str:
     """Normalize a URL for consistent comparison.
 
@@ -37,8 +69,60 @@ def normalize_url(url: str) -> str:
     str
         The normalized URL
     """
+    url = url.strip()
+    return _normalize_plain_url(url) or _normalize_parsed_url(url)
+
+
+def _normalize_plain_url(url: str) -> Optional[str]:
+    """Normalize common URLs with plain string scanning.
+
+    Handles absolute ASCII URLs whose query needs no percent-decoding and
+    returns exactly what :func:`_normalize_parsed_url` would. Anything
+    else returns ``None`` so the caller falls back to ``urllib.parse``.
+    """
+    scheme, sep, rest = url.partition('://')
+    if not sep or not scheme.isascii() or not scheme.isalpha():
+        return None
+    if not rest.isascii() or not rest.isprintable() or ' ' in rest:
+        return None
+
+    # The authority ends at the first of '/', '?' or '#'
+    end = len(rest)
+    for delimiter in '/?#':
+        pos = rest.find(delimiter, 0, end)
+        if pos != -1:
+            end = pos
+    netloc = rest[:end]
+    if not netloc or '[' in netloc or ']' in netloc:
+        return None
+    path, _, query = rest[end:].partition('#')[0].partition('?')
+    if ';' in path or not _PLAIN_QUERY_RE.fullmatch(query):
+        return None
+
+    # Same rules as parse_qs: pairs without '=' or with an empty value are dropped
+    params: dict = {}
+    for pair in query.split('&'):
+        name, eq, value = pair.partition('=')
+        if not eq or not value:
+            continue
+        if '=' in value:
+            return None
+        if name not in _TRACKING_PARAMS:
+            params.setdefault(name, []).append(value)
+    sorted_query = '&'.join(f"{name}={value}" for name in sorted(params) for value in params[name])
+
+    scheme = scheme.lower()
+    if scheme == 'http':
+        scheme = 'https'
+    path = path.rstrip('/') if path != '/' else '/'
+    normalized = f"{scheme}://{netloc.lower()}{path}"
+    return f"{normalized}?{sorted_query}" if sorted_query else normalized
+
+
+def _normalize_parsed_url(url: str) -> str:
+    """Normalize any URL using ``urllib.parse``."""
     # Parse the URL
-    parsed = urlparse(url.strip())
+    parsed = urlparse(url)
 
     # Normalize scheme (always use https if supported)
     scheme = parsed.scheme.lower()
@@ -49,14 +133,8 @@ def normalize_url(url: str) -> str:
     netloc = parsed.netloc.lower()
 
     # Parse and sort query parameters, removing tracking params
-    tracking_params = {
-        'utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content',
-        'fbclid', 'gclid', 'ref', 'source', 'share'
-    }
-
     query_dict = parse_qs(parsed.query)
-    # Remove tracking parameters
-    query_dict = {k: v for k, v in query_dict.items() if k not in tracking_params}
+    query_dict = {k: v for k, v in query_dict.items() if k not in _TRACKING_PARAMS}
     # Sort by key for consistency
     sorted_query = urlencode(sorted(query_dict.items()), doseq=True)
 
@@ -76,6 +154,7 @@ def normalize_url(url: str) -> str:
     return normalized
 
 
+@lru_cache(maxsize=URL_CACHE_SIZE)
 def extract_video_id(url: str) -> Optional[str]:
     """Extract the video ID from a URL for platform-specific deduplication.
 
@@ -98,70 +177,26 @@ def extract_video_id(url: str) -> Optional[str]:
         The video ID if found, None otherwise
     """
     url_lower = url.lower()
-    parsed = urlparse(url)
-
-    # Pornhub
-    if 'pornhub.com' in url_lower:
-        match = re.search(r'viewkey=([a-f0-9]+)', url, re.IGNORECASE)
-        if match:
-            return f"pornhub:{match.group(1)}"
 
     # YouTube
-    if 'youtube.com' in url_lower or 'youtu.be' in url_lower:
-        if 'youtu.be' in url_lower:
-            video_id = parsed.path.strip('/')
-            return f"youtube:{video_id}"
-        else:
-            query = parse_qs(parsed.query)
-            if 'v' in query:
-                return f"youtube:{query['v'][0]}"
-
-    # Xvideos
-    if 'xvideos.com' in url_lower:
-        match = re.search(r'/video([0-9]+)/', url)
-        if match:
-            return f"xvideos:{match.group(1)}"
-
-    # Xhamster
-    if 'xhamster.com' in url_lower:
-        match = re.search(r'/videos/[^/]+-([0-9]+)', url)
-        if match:
-            return f"xhamster:{match.group(1)}"
-
-    # Redtube
-    if 'redtube.com' in url_lower:
-        match = re.search(r'/([0-9]+)', url)
-        if match:
-            return f"redtube:{match.group(1)}"
-
-    # Twitter/X
-    if 'twitter.com' in url_lower or 'x.com' in url_lower:
-        match = re.search(r'/status/([0-9]+)', url)
-        if match:
-            return f"twitter:{match.group(1)}"
-
-    # Reddit
-    if 'reddit.com' in url_lower:
-        match = re.search(r'/comments/([a-z0-9]+)', url)
-        if match:
-            return f"reddit:{match.group(1)}"
-
-    # Spankbang
-    if 'spankbang.com' in url_lower:
-        match = re.search(r'/([a-z0-9]+)/video/', url)
-        if match:
-            return f"spankbang:{match.group(1)}"
-
-    # OnlyFans (if supported)
-    if 'onlyfans.com' in url_lower:
-        match = re.search(r'/([0-9]+)/', url)
-        if match:
-            return f"onlyfans:{match.group(1)}"
+    if 'youtu.be' in url_lower:
+        return f"youtube:{urlparse(url).path.strip('/')}"
+    if 'youtube.com' in url_lower:
+        query = parse_qs(urlparse(url).query)
+        if 'v' in query:
+            return f"youtube:{query['v'][0]}"
+
+    for hosts, pattern, prefix in _VIDEO_ID_RULES:
+        if any(host in url_lower for host in hosts):
+            match = pattern.search(url)
+            if match:
+                return f"{prefix}:{match.group(1)}"
 
     # Generic fallback - use the full normalized URL
     return None
 
 
+@lru_cache(maxsize=URL_CACHE_SIZE)
 def compute_url_hash(url: str) -> str:
     """Compute a hash of the normalized URL for efficient storage and comparison.
 
@@ -207,14 +242,11 @@ def extract_filename_base(filepath: str) -> str:
     # Remove extension
     base, _ = os.path.splitext(filename)
 
-    # Remove common quality markers
-    base = re.sub(r'[-_\s]*(1080p|720p|480p|360p|4k|hd|sd|uhd)[-_\s]*', '', base, flags=re.IGNORECASE)
-
-    # Remove resolution markers like "1920x1080"
-    base = re.sub(r'[-_\s]*\d{3,4}x\d{3,4}[-_\s]*', '', base)
+    # Remove quality markers and resolutions like "1920x1080" in one pass
+    base = _FILENAME_MARKER_RE.sub('', base)
 
     # Normalize whitespace and special characters
-    base = re.sub(r'[^a-z0-9]+', ' ', base.lower())
+    base = _NON_ALNUM_RE.sub(' ', base.lower())
 
     # Remove extra whitespace
     base = ' '.join(base.split())
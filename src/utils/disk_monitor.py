@@ -9,11 +9,90 @@ administrator notified.
 from __future__ import annotations
 
 import asyncio
+import shutil
+import time
+from contextlib import suppress
+from typing import Dict, Optional, Tuple
+
 import psutil
-from typing import Optional
+
+try:
+    from asyncio import timeout as async_timeout
+except ImportError:  # Python < 3.11; async-timeout ships with aiohttp there
+    from async_timeout import timeout as async_timeout
 
 from .logger import get_logger
 
+# Seconds a disk usage sample stays valid before statfs is issued again
+DISK_USAGE_TTL = 2.0
+
+_disk_usage_cache: Dict[str, Tuple[float, tuple]] = {}
+
+# Seconds a CPU utilization sample is shared before psutil is queried again
+CPU_USAGE_TTL = 2.0
+
+# (monotonic time, percent) of the last shared CPU sample
+_cpu_sample: Tuple[float, float] = (float("-inf"), 0.0)
+
+# Prime psutil's CPU counters so the first non-blocking reading is meaningful
+psutil.cpu_percent(interval=None)
+
+
+def get_disk_usage(path: str, max_age: float = DISK_USAGE_TTL):
+    """Return ``shutil.disk_usage(path)``, reusing a recent sample.
+
+    Worker loops and the concurrency governor query the same download
+    directory every few seconds; caching the result keeps them from
+    issuing a ``statfs`` call on every iteration.
+
+    Parameters
+    ----------
+    path: str
+        The path on the filesystem to inspect.
+    max_age: float, optional
+        Maximum age in seconds of a cached sample before it is refreshed.
+
+    Returns
+    -------
+    tuple
+        Named tuple with ``total``, ``used`` and ``free`` in bytes.
+    """
+    now = time.monotonic()
+    cached = _disk_usage_cache.get(path)
+    if cached is not None and now - cached[0] < max_age:
+        return cached[1]
+    usage = shutil.disk_usage(path)
+    _disk_usage_cache[path] = (now, usage)
+    return usage
+
+
+def get_used_percent(path: str, max_age: float = DISK_USAGE_TTL) -> float:
+    """Return the used percentage of the filesystem containing ``path``.
+
+    Matches ``psutil.disk_usage().percent``: space reserved for root is
+    excluded from the total.
+    """
+    usage = get_disk_usage(path, max_age)
+    available = usage.used + usage.free
+    return (usage.used / available * 100) if available else 0.0
+
+
+def get_cpu_percent(max_age: float = CPU_USAGE_TTL) -> float:
+    """Return system-wide CPU utilization, reusing a recent sample.
+
+    ``psutil.cpu_percent(interval=None)`` measures since its previous
+    call, so independent callers would shorten each other's windows.
+    The governor and the status report both read through here instead.
+    """
+    global _cpu_sample
+    now = time.monotonic()
+    taken, value = _cpu_sample
+    if now - taken < max_age:
+        return value
+    value = psutil.cpu_percent(interval=None)
+    _cpu_sample = (now, value)
+    return value
+
 
 def get_free_space_bytes(path: str) -> int:
     """Return the free space in bytes for the filesystem containing ``path``.
@@ -28,8 +107,7 @@ def get_free_space_bytes(path: str) -> int:
     int
         The number of free bytes available to the current user.
     """
-    usage = psutil.disk_usage(path)
-    return usage.free
+    return get_disk_usage(path).free
 
 
 def is_low_disk(path: str, threshold_gb: float = 10.0) -> bool:
@@ -47,9 +125,8 @@ def is_low_disk(path: str, threshold_gb: float = 10.0) -> bool:
     bool
         True if free space is less than the threshold, otherwise False.
     """
-    free_bytes = get_free_space_bytes(path)
-    free_gb = free_bytes / (1024 ** 3)
-    return free_gb < threshold_gb
+    # Backed by the shared usage cache, so polling workers cost no syscalls
+    return get_free_space_bytes(path) < threshold_gb * (1024 ** 3)
 
 
 class ConcurrencyGovernor:
@@ -70,7 +147,10 @@ class ConcurrencyGovernor:
         self.cpu_threshold = cpu_threshold
         self.disk_threshold = disk_threshold
         self.interval = interval
+        self._set_pressure_scales()
         self._target_workers = min_workers
+        # Set whenever the recommendation changes; consumers clear it after reading
+        self.target_changed = asyncio.Event()
         self._stop_event = asyncio.Event()
         self._task: Optional[asyncio.Task] = None
         self.logger = get_logger(self.__class__.__name__)
@@ -80,6 +160,17 @@ class ConcurrencyGovernor:
         """Return the current recommended number of workers."""
         return self._target_workers
 
+    def _set_pressure_scales(self) -> None:
+        # Reciprocals of the thresholds, so each sample costs multiplications only
+        self._cpu_scale = 1.0 / max(1.0, self.cpu_threshold)
+        self._disk_scale = 1.0 / max(1.0, self.disk_threshold)
+
+    def _set_target(self, value: int) -> None:
+        value = max(self.min_workers, min(self.max_workers, value))
+        if value != self._target_workers:
+            self._target_workers = value
+            self.target_changed.set()
+
     async def start(self) -> None:
         """Start the governor loop."""
         if self._task:
@@ -109,25 +200,30 @@ class ConcurrencyGovernor:
         self.max_workers = max_workers
         self.cpu_threshold = cpu_threshold
         self.disk_threshold = disk_threshold
-        self._target_workers = max(min(self._target_workers, max_workers), min_workers)
+        self._set_pressure_scales()
+        self._set_target(self._target_workers)
 
     async def _monitor_loop(self) -> None:
         while not self._stop_event.is_set():
-            try:
-                cpu = psutil.cpu_percent(interval=None)
-                disk = psutil.disk_usage(self.download_path).percent
-                self._adjust_target(cpu, disk)
-            except Exception as exc:
-                self.logger.warning("Concurrency governor sample failed: %s", exc)
-            try:
-                await asyncio.wait_for(self._stop_event.wait(), timeout=self.interval)
-            except asyncio.TimeoutError:
-                continue
+            # With min == max the target cannot move, so sampling is wasted work;
+            # update_limits can widen the range again at any time
+            if self.min_workers < self.max_workers:
+                try:
+                    cpu = get_cpu_percent()
+                    disk = get_used_percent(self.download_path)
+                    self._adjust_target(cpu, disk)
+                except Exception as exc:
+                    self.logger.warning("Concurrency governor sample failed: %s", exc)
+            # A timeout scope, unlike wait_for, does not wrap the wait in a new task
+            with suppress(asyncio.TimeoutError):
+                async with async_timeout(self.interval):
+                    await self._stop_event.wait()
 
     def _adjust_target(self, cpu: float, disk: float) -> None:
-        pressure = max(cpu / max(1.0, self.cpu_threshold), disk / max(1.0, self.disk_threshold))
-        if pressure >= 1.0 and self._target_workers > self.min_workers:
-            self._target_workers -= 1
-        elif pressure < 0.85 and self._target_workers < self.max_workers:
-            self._target_workers += 1
-        self._target_workers = max(self.min_workers, min(self.max_workers, self._target_workers))
+        pressure = max(cpu * self._cpu_scale, disk * self._disk_scale)
+        target = self._target_workers
+        if pressure >= 1.0:
+            target -= 1
+        elif pressure < 0.85:
+            target += 1
+        self._set_target(target)
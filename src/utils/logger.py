@@ -12,9 +12,31 @@ specified file as well as the console.
 
 from __future__ import annotations
 
+import atexit
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+
+class _SecondCachedFormatter(logging.Formatter):
+    """Formatter that renders ``asctime`` once per wall-clock second.
+
+    ``datefmt`` has one-second resolution, so records logged within the
+    same second (progress updates, batch inserts) reuse the string
+    instead of repeating ``localtime`` and ``strftime``.
+    """
+
+    _cached: tuple = (None, "")
+
+    def formatTime(self, record: logging.LogRecord, datefmt: str | None = None) -> str:
+        second = int(record.created)
+        cached_second, cached_text = self._cached
+        if second == cached_second:
+            return cached_text
+        text = super().formatTime(record, datefmt)
+        self._cached = (second, text)
+        return text
 
 
 def setup_logging(log_level: str, log_file_path: str) -> None:
@@ -43,7 +65,7 @@ def setup_logging(log_level: str, log_file_path: str) -> None:
     os.makedirs(os.path.dirname(log_file_path), exist_ok=True)
 
     # Create formatters
-    formatter = logging.Formatter(
+    formatter = _SecondCachedFormatter(
         fmt="%(asctime)s [%(levelname)s] [%(name)s] %(message)s",
         datefmt="%Y-%m-%d %H:%M:%S",
     )
@@ -58,8 +80,21 @@ def setup_logging(log_level: str, log_file_path: str) -> None:
     console_handler.setFormatter(formatter)
     console_handler.setLevel(level)
 
+    # Callers only enqueue records; a listener thread does the file and
+    # console writes so they never block the event loop
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    listener.start()
+    # Flush what is still queued when the process exits
+    atexit.register(listener.stop)
+
+    # The queue handler only merges args (and any traceback) into the
+    # message; the listener's handlers apply the real format
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter("%(message)s"))
+
     # Configure root logger
-    logging.basicConfig(level=level, handlers=[file_handler, console_handler])
+    logging.basicConfig(level=level, handlers=[queue_handler])
 
 
 def get_logger(name: str) -> logging.Logger:
@@ -7,20 +7,43 @@ information through the Telegram bot.
 
 from __future__ import annotations
 
+import time
+from typing import Callable, Dict, NamedTuple, Tuple
+
 import psutil
 
+from .disk_monitor import get_cpu_percent, get_used_percent
+
+# Seconds a sampled metric is reused before psutil is queried again
+METRIC_TTL = 2.0
+
+_metric_cache: Dict[str, Tuple[float, float]] = {}
+
+
+def _cached_metric(key: str, sample: Callable[[], float]) -> float:
+    """Return the cached value for ``key`` or refresh it with ``sample``."""
+    now = time.monotonic()
+    cached = _metric_cache.get(key)
+    if cached is not None and now - cached[0] < METRIC_TTL:
+        return cached[1]
+    value = sample()
+    _metric_cache[key] = (now, value)
+    return value
+
 
 def get_cpu_usage() -> float:
     """Return the current system-wide CPU utilization as a percentage.
 
-    The value returned is averaged over a short period of time.
+    The value is the average since the previous non-blocking sample (the
+    first one is taken at import), so the call never sleeps on the event
+    loop. The sample is shared with the concurrency governor.
     """
-    return psutil.cpu_percent(interval=0.5)
+    return get_cpu_percent()
 
 
 def get_memory_usage() -> float:
     """Return the current memory usage as a percentage of total available memory."""
-    return psutil.virtual_memory().percent
+    return _cached_metric("memory", lambda: psutil.virtual_memory().percent)
 
 
 def get_disk_usage(path: str) -> float:
@@ -36,4 +59,23 @@ def get_disk_usage(path: str) -> float:
     float
         Percentage of the filesystem used (0 – 100).
     """
-    return psutil.disk_usage(path).percent
\ No newline at end of file
+    # Shares the governor's and workers' statvfs sample for the same path
+    return get_used_percent(path)
+
+
+class SystemSnapshot(NamedTuple):
+    """CPU, memory and disk usage percentages taken together."""
+
+    cpu: float
+    memory: float
+    disk: float
+
+
+def snapshot(path: str) -> SystemSnapshot:
+    """Return CPU, memory and disk usage for ``path`` in one call.
+
+    Each reading goes through the same caches as the individual getters,
+    so a status report costs at most one ``/proc/stat``, one
+    ``/proc/meminfo`` and one ``statvfs`` read.
+    """
+    return SystemSnapshot(get_cpu_usage(), get_memory_usage(), get_disk_usage(path))
@@ -8,8 +8,9 @@ from __future__ import annotations
 
 import re
 import html
+from functools import lru_cache
 from urllib.parse import urlparse, quote, unquote
-from typing import List
+from typing import Dict, List
 
 
 _URL_REGEX = re.compile(
@@ -21,6 +22,27 @@ _URL_REGEX = re.compile(
     re.IGNORECASE | re.UNICODE
 )
 _MAGNET_REGEX = re.compile(r"magnet:\?[^\s\r\n]+", re.IGNORECASE)
+# Longest URL accepted by is_valid_url; longer inputs are never cached
+MAX_URL_LENGTH = 2048
+# The same URL is typically sanitised and validated several times in a row
+URL_CACHE_SIZE = 4096
+
+# Characters that make urlsplit rewrite or reject a URL before splitting it;
+# URLs containing them skip the fast netloc check
+_URLSPLIT_SPECIAL_RE = re.compile(r"[\[\]\t\r\n]")
+_NETLOC_END_RE = re.compile(r"[/?#]")
+
+# ASCII control characters (including CR, LF and tab). They never occur inside
+# a multi-byte UTF-8 sequence, so they can be deleted from the encoded bytes,
+# which bytes.translate does several times faster than str.translate
+_CONTROL_BYTES = bytes([*range(32), 127])
+
+# Both patterns in one alternation, so extract_urls scans the text once;
+# group 1 is a magnet link, group 2 an HTTP(S) URL
+_LINK_REGEX = re.compile(
+    f"({_MAGNET_REGEX.pattern})|({_URL_REGEX.pattern})",
+    re.IGNORECASE | re.UNICODE
+)
 
 
 def sanitize_url(url: str) -> str:
@@ -38,11 +60,16 @@ def sanitize_url(url: str) -> str:
     """
     if not url:
         return ""
-    
+    if len(url) <= MAX_URL_LENGTH:
+        return _sanitize_url_cached(url)
+    return _sanitize_url(url)
+
+
+def _sanitize_url(url: str) -> str:
     url = url.strip()
     url = html.unescape(url)
-    url = url.replace('\r', '').replace('\n', '').replace('\t', '')
-    url = ''.join(char for char in url if ord(char) >= 32 and ord(char) != 127)
+    # surrogatepass round-trips any lone surrogates unchanged
+    url = url.encode("utf-8", "surrogatepass").translate(None, _CONTROL_BYTES).decode("utf-8", "surrogatepass")
     
     try:
         parsed = urlparse(url)
@@ -57,6 +84,9 @@ def sanitize_url(url: str) -> str:
         return ""
 
 
+_sanitize_url_cached = lru_cache(maxsize=URL_CACHE_SIZE)(_sanitize_url)
+
+
 def is_valid_url(url: str) -> bool:
     """Return True if the input string appears to be a valid URL.
 
@@ -77,8 +107,21 @@ def is_valid_url(url: str) -> bool:
     if not url:
         return False
     url = url.strip()
-    if len(url) > 2048:
+    if len(url) > MAX_URL_LENGTH:
         return False
+    return _is_valid_stripped_url(url)
+
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
+def _is_valid_stripped_url(url: str) -> bool:
+    # Plain http(s) URLs only need their netloc, which is the text between
+    # "://" and the first "/", "?" or "#"; everything else goes to urlparse
+    if url.startswith(("http://", "https://")) and not _URLSPLIT_SPECIAL_RE.search(url):
+        start = url.index("://") + 3
+        end = _NETLOC_END_RE.search(url, start)
+        netloc = url[start:end.start() if end else len(url)]
+        if netloc.isascii():
+            return 0 < len(netloc) <= 253
     parsed = urlparse(url)
     if parsed.scheme not in {"http", "https", "magnet"}:
         return False
@@ -92,7 +135,11 @@ def is_valid_url(url: str) -> bool:
 
 
 def extract_urls(text: str) -> List[str]:
-    """Extract all HTTP/HTTPS URLs from a block of text.
+    """Extract all HTTP/HTTPS URLs and magnet links from a block of text.
+
+    HTTP(S) URLs come first, then magnet links, each in order of
+    appearance and without duplicates. A tracker URL inside a magnet
+    link is part of that link and is not returned on its own.
 
     Parameters
     ----------
@@ -106,6 +153,18 @@ def extract_urls(text: str) -> List[str]:
     """
     if not text:
         return []
-    urls = _URL_REGEX.findall(text)
-    magnets = _MAGNET_REGEX.findall(text)
-    return list(dict.fromkeys(urls + magnets))
+    # Most messages carry no link; a substring check is far cheaper than a scan
+    lowered = text.lower()
+    if "http" not in lowered and "magnet:" not in lowered:
+        return []
+    # Dicts dedupe while keeping first-seen order; the two never share keys
+    urls: Dict[str, None] = {}
+    magnets: Dict[str, None] = {}
+    for match in _LINK_REGEX.finditer(text):
+        magnet = match.group(1)
+        if magnet:
+            magnets[magnet] = None
+        else:
+            urls[match.group(2)] = None
+    urls.update(magnets)
+    return list(urls)
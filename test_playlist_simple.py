@@ -2,8 +2,13 @@
 """Simple test for playlist URL detection and extraction."""
 
 import asyncio
+import os
+from itertools import islice
 from yt_dlp import YoutubeDL
 
+# Set PLAYLIST_DEBUG=1 to trace each extraction step
+_DEBUG = bool(os.environ.get("PLAYLIST_DEBUG"))
+
 def is_playlist_url(url: str) -> bool:
     """Check if URL is a playlist."""
     playlist_keywords = [
@@ -24,52 +29,44 @@ async def extract_playlist_urls_simple(url: str, max_videos: int = 5) -> list[st
             "age_limit": 99,  # Allow adult content
             "ignoreerrors": True,  # Continue on errors
             "playlistend": max_videos,  # Limit number of videos
+            "lazy_playlist": True,  # Stop fetching pages once the limit is reached
         }
 
         def extract_sync():
             with YoutubeDL(ydl_opts) as ydl:
-                print(f"DEBUG: Extracting playlist info for {url}")
+                if _DEBUG:
+                    print(f"DEBUG: Extracting playlist info for {url}")
                 info = ydl.extract_info(url, download=False)
 
                 if not info:
-                    print("DEBUG: No info returned from yt-dlp")
+                    if _DEBUG:
+                        print("DEBUG: No info returned from yt-dlp")
                     return []
 
                 # Handle different playlist structures
-                if 'entries' in info:
-                    entries = info['entries']
-                    print(f"DEBUG: Found {len(entries)} entries in playlist")
-                elif isinstance(info, list):
+                if isinstance(info, list):
                     entries = info
-                    print(f"DEBUG: Info is list with {len(entries)} items")
+                elif 'entries' in info:
+                    entries = info['entries'] or []
                 else:
-                    print(f"DEBUG: Unexpected info structure: {type(info)}")
+                    if _DEBUG:
+                        print(f"DEBUG: Unexpected info structure: {type(info)}")
                     return []
 
-                # Extract URLs from entries
-                video_urls = []
-                for i, entry in enumerate(entries):
-                    if isinstance(entry, dict):
-                        video_url = entry.get('url') or entry.get('webpage_url')
-                        if video_url:
-                            video_urls.append(video_url)
-                            print(f"DEBUG: Extracted URL {i+1}: {video_url[:60]}...")
-                        else:
-                            print(f"DEBUG: No URL found in entry {i+1}")
-                    elif isinstance(entry, str):
-                        video_urls.append(entry)
-                        print(f"DEBUG: String URL {i+1}: {entry[:60]}...")
-
+                # Extract URLs from entries, dropping repeats but keeping order
+                found = (
+                    (entry.get('url') or entry.get('webpage_url')) if isinstance(entry, dict) else entry
+                    for entry in islice(entries, max_videos)
+                    if isinstance(entry, (dict, str))
+                )
+                video_urls = list(dict.fromkeys(u for u in found if u))
                 limited_urls = video_urls[:max_videos]
-                print(f"DEBUG: Returning {len(limited_urls)} URLs (from {len(video_urls)} found)")
+                if _DEBUG:
+                    print(f"DEBUG: Returning {len(limited_urls)} URLs (from {len(video_urls)} found)")
                 return limited_urls
 
-        # Run in thread pool to avoid blocking
-        import concurrent.futures
-        loop = asyncio.get_event_loop()
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            result = await loop.run_in_executor(executor, extract_sync)
-            return result
+        # Run in a worker thread to avoid blocking
+        return await asyncio.to_thread(extract_sync)
 
     except Exception as e:
         print(f"Error extracting playlist URLs: {e}")
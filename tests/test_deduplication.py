@@ -0,0 +1,50 @@
+"""Unit tests for URL normalisation and video id extraction."""
+
+from __future__ import annotations
+
+import pytest
+
+from autodl_enhanced.src.utils.deduplication import (
+    _normalize_parsed_url,
+    _normalize_plain_url,
+    extract_video_id,
+    normalize_url,
+)
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "HTTP://Example.COM/Path/?b=2&a=1&utm_source=x#frag",
+        "https://www.youtube.com/watch?v=abc&v=def&list=PL1",
+        "https://example.com/",
+        "https://example.com//",
+        "https://example.com?a=&b&c=3",
+        "https://user@Example.com:8080/a/b?=x&&z=1",
+    ],
+)
+def test_plain_scanner_matches_urllib(url):
+    assert _normalize_plain_url(url) == _normalize_parsed_url(url)
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://example.com/?q=a%20b",
+        "https://example.com/?q=a+b",
+        "https://example.com/?q=a/b",
+        "https://example.com/p;params?a=1",
+        "https://[::1]/video",
+        "example.com/video",
+    ],
+)
+def test_plain_scanner_defers_to_urllib(url):
+    assert _normalize_plain_url(url) is None
+    assert normalize_url(url) == _normalize_parsed_url(url.strip())
+
+
+def test_extract_video_id():
+    assert extract_video_id("https://youtu.be/abcdefghijk") == "youtube:abcdefghijk"
+    assert extract_video_id("https://www.youtube.com/watch?v=abcdefghijk") == "youtube:abcdefghijk"
+    assert extract_video_id("https://x.com/user/status/123") == "twitter:123"
+    assert extract_video_id("https://example.com/video") is None
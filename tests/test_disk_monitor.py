@@ -0,0 +1,78 @@
+"""Unit tests for the disk monitoring helpers."""
+
+from __future__ import annotations
+
+import asyncio
+import shutil
+import tempfile
+
+import pytest
+
+from autodl_enhanced.src.utils import disk_monitor
+
+
+def test_is_low_disk_reuses_cached_usage(monkeypatch):
+    calls = []
+    real_disk_usage = shutil.disk_usage
+
+    def counting_disk_usage(path):
+        calls.append(path)
+        return real_disk_usage(path)
+
+    monkeypatch.setattr(disk_monitor.shutil, "disk_usage", counting_disk_usage)
+    monkeypatch.setattr(disk_monitor, "_disk_usage_cache", {})
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for _ in range(10):
+            assert disk_monitor.is_low_disk(tmpdir, 0.0) is False
+        assert disk_monitor.is_low_disk(tmpdir, float("inf")) is True
+        assert calls == [tmpdir]
+
+        # A zero max age forces a fresh sample
+        disk_monitor.get_disk_usage(tmpdir, max_age=0)
+        assert len(calls) == 2
+
+
+def test_governor_signals_target_changes():
+    governor = disk_monitor.ConcurrencyGovernor(
+        "/", min_workers=1, max_workers=2, cpu_threshold=90, disk_threshold=90
+    )
+    governor._adjust_target(cpu=10, disk=10)
+    assert governor.target_workers == 2
+    assert governor.target_changed.is_set()
+
+    # Already at the maximum: no change, no signal
+    governor.target_changed.clear()
+    governor._adjust_target(cpu=10, disk=10)
+    assert not governor.target_changed.is_set()
+
+    governor.update_limits(1, 1, 90, 90)
+    assert governor.target_workers == 1
+    assert governor.target_changed.is_set()
+
+
+@pytest.mark.asyncio
+async def test_pinned_governor_skips_sampling(monkeypatch):
+    samples = []
+    monkeypatch.setattr(disk_monitor.psutil, "cpu_percent", lambda interval=None: samples.append(1) or 0.0)
+    governor = disk_monitor.ConcurrencyGovernor(
+        "/", min_workers=2, max_workers=2, cpu_threshold=90, disk_threshold=90, interval=0.01
+    )
+    await governor.start()
+    await asyncio.sleep(0.05)
+    await governor.stop()
+    assert samples == []
+    assert governor.target_workers == 2
+
+
+def test_cpu_sample_is_shared_with_status_reports(monkeypatch):
+    from autodl_enhanced.src.utils import performance
+
+    samples = []
+    monkeypatch.setattr(disk_monitor.psutil, "cpu_percent", lambda interval=None: samples.append(1) or 42.0)
+    monkeypatch.setattr(disk_monitor, "_cpu_sample", (float("-inf"), 0.0))
+    governor = disk_monitor.ConcurrencyGovernor(
+        "/", min_workers=1, max_workers=4, cpu_threshold=90, disk_threshold=90
+    )
+    governor._adjust_target(disk_monitor.get_cpu_percent(), 0.0)
+    assert performance.get_cpu_usage() == 42.0
+    assert samples == [1]
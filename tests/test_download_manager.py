@@ -7,13 +7,14 @@ monkeypatching to override the internal _download method.
 
 from __future__ import annotations
 
+import asyncio
 import os
 import tempfile
 
 import pytest
 
 from autodl_enhanced.src.queue_manager import QueueManager, DownloadTask
-from autodl_enhanced.src.download_manager import DownloadManager
+from autodl_enhanced.src.download_manager import DownloadManager, is_playlist_url
 from autodl_enhanced.src.config_manager import Config
 
 
@@ -46,7 +47,7 @@ async def test_process_task_success(monkeypatch):
         # Create download manager
         dm = DownloadManager(qm, config)
         # Monkeypatch _download to always succeed
-        async def fake_download(task: DownloadTask) -> str:
+        async def fake_download(task: DownloadTask, url: str) -> str:
             return os.path.join(config.download_dir, "dummy.mp4")
         monkeypatch.setattr(dm, "_download", fake_download)
         # Record completed calls
@@ -69,7 +70,7 @@ async def test_process_task_failure(monkeypatch):
         task = await qm.fetch_next_task()
         dm = DownloadManager(qm, config)
         # Monkeypatch _download to raise
-        async def fake_download(task: DownloadTask) -> str:
+        async def fake_download(task: DownloadTask, url: str) -> str:
             raise RuntimeError("Simulated download failure")
         monkeypatch.setattr(dm, "_download", fake_download)
         recorded = {}
@@ -85,3 +86,87 @@ async def test_process_task_failure(monkeypatch):
         assert 'failed' in recorded
         assert recorded['failed'][0] == task.id
         assert 'rescheduled' not in recorded
+
+
+@pytest.mark.asyncio
+async def test_set_worker_limit_resizes_slots():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        config = create_config(tmpdir)
+        config.max_concurrent = 2
+        qm = QueueManager(config.db_path)
+        dm = DownloadManager(qm, config)
+        # Occupy both slots, then shrink to one: the busy slot is retired on release
+        assert await dm._wait_for_slot()
+        assert await dm._wait_for_slot()
+        await dm.set_worker_limit(1)
+        await dm._release_slot()
+        assert dm._slot_sem.locked()
+        await dm._release_slot()
+        assert not dm._slot_sem.locked()
+        # Growing again hands out an extra slot straight away
+        await dm.set_worker_limit(3)
+        for _ in range(3):
+            assert await dm._wait_for_slot()
+        assert dm._slot_sem.locked()
+
+
+@pytest.mark.asyncio
+async def test_resume_wakes_paused_worker(monkeypatch):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        config = create_config(tmpdir)
+        config.min_disk_space_gb = 0
+        qm = QueueManager(config.db_path)
+        dm = DownloadManager(qm, config)
+        fetched = asyncio.Event()
+
+        async def fake_fetch_next_task():
+            fetched.set()
+            dm._stop_event.set()
+            return None
+
+        monkeypatch.setattr(qm, "fetch_next_task", fake_fetch_next_task)
+        dm.paused = True
+        worker = asyncio.create_task(dm._worker_loop())
+        await asyncio.sleep(0.05)
+        assert not fetched.is_set()
+        dm.paused = False
+        await asyncio.wait_for(fetched.wait(), timeout=1)
+        worker.cancel()
+        await asyncio.gather(worker, return_exceptions=True)
+
+
+def test_is_playlist_url_matches_keywords_case_insensitively():
+    assert is_playlist_url("https://www.youtube.com/playlist?list=PL123")
+    assert is_playlist_url("https://www.youtube.com/watch?v=abc&LIST=PL123")
+    assert is_playlist_url("https://music.example.com/Album/42")
+    assert not is_playlist_url("https://www.youtube.com/watch?v=abc")
+
+
+@pytest.mark.asyncio
+async def test_stream_to_file_waits_for_pending_write_on_error(monkeypatch):
+    import threading
+    from autodl_enhanced.src import download_manager as dm_module
+
+    monkeypatch.setattr(dm_module, "FILE_CHUNK_SIZE", 4)
+    started = threading.Event()
+    finished = threading.Event()
+
+    class SlowFile:
+        def write(self, chunk):
+            started.set()
+            finished.wait(0.2)
+            finished.set()
+
+    class FailingContent:
+        async def iter_any(self):
+            yield b"abcd"
+            # Let the executor pick up the first write before failing
+            await asyncio.get_running_loop().run_in_executor(None, started.wait)
+            raise ConnectionResetError("peer went away")
+
+    class FakeResponse:
+        content = FailingContent()
+
+    with pytest.raises(ConnectionResetError):
+        await DownloadManager._stream_to_file(FakeResponse(), SlowFile())
+    assert finished.is_set()
@@ -9,8 +9,10 @@ from __future__ import annotations
 
 import asyncio
 import os
+import sqlite3
 import tempfile
 
+import aiosqlite
 import pytest
 
 from autodl_enhanced.src.queue_manager import QueueManager
@@ -60,3 +62,191 @@ async def test_task_lifecycle():
         await qm.clear_failed_tasks()
         count_failed_after = await qm.count_by_status('failed')
         assert count_failed_after == 0
+
+
+@pytest.mark.asyncio
+async def test_get_recent_failed():
+    with tempfile.NamedTemporaryFile(delete=True) as tmp:
+        qm = QueueManager(tmp.name)
+        await qm.initialize()
+        first, _ = await qm.add_task("https://example.com/video3")
+        second, _ = await qm.add_task("https://example.com/video4")
+        await qm.mark_failed(first, "boom")
+        await qm.mark_failed(second, "bang")
+        recent = await qm.get_recent_failed(600, 1)
+        assert [(t.id, t.error_message) for t in recent] == [(second, "bang")]
+        assert await qm.get_recent_failed(-600, 5) == []
+
+
+@pytest.mark.asyncio
+async def test_add_tasks_batch_dedup():
+    with tempfile.NamedTemporaryFile(delete=True) as tmp:
+        qm = QueueManager(tmp.name)
+        await qm.initialize()
+        existing, _ = await qm.add_task("https://example.com/a")
+        results = await qm.add_tasks([
+            "https://example.com/a",
+            "https://example.com/b",
+            "https://example.com/b",
+            "https://youtu.be/abcdefghijk",
+            "https://www.youtube.com/watch?v=abcdefghijk",
+        ])
+        assert results[0] == (existing, False)
+        assert results[1][1] and results[3][1]
+        assert results[2] == (results[1][0], False)
+        assert results[4] == (results[3][0], False)
+        pending = await qm.get_pending_tasks()
+        assert [t.id for t in pending] == [existing, results[1][0], results[3][0]]
+        assert await qm.add_tasks([]) == []
+
+
+@pytest.mark.asyncio
+async def test_get_pending_preview():
+    with tempfile.NamedTemporaryFile(delete=True) as tmp:
+        qm = QueueManager(tmp.name)
+        await qm.initialize()
+        assert await qm.get_pending_preview(limit=2) == ([], 0)
+        await qm.add_tasks([f"https://example.com/p{i}" for i in range(5)])
+        tasks, total = await qm.get_pending_preview(limit=2)
+        assert [t.url for t in tasks] == ["https://example.com/p0", "https://example.com/p1"]
+        assert total == 5
+
+
+@pytest.mark.asyncio
+async def test_fetch_next_task_query_uses_pending_index():
+    with tempfile.NamedTemporaryFile(delete=True) as tmp:
+        qm = QueueManager(tmp.name)
+        await qm.initialize()
+        async with qm._connect() as conn:
+            cursor = await conn.execute(
+                """
+                EXPLAIN QUERY PLAN
+                SELECT * FROM tasks
+                WHERE status='pending'
+                  AND (next_attempt_at IS NULL OR next_attempt_at <= ?)
+                ORDER BY id ASC
+                LIMIT 1
+                """,
+                (0,),
+            )
+            plan = " ".join(row[3] for row in await cursor.fetchall())
+        await qm.close()
+        assert "idx_pending_ready" in plan
+        assert "TEMP B-TREE" not in plan
+
+
+@pytest.mark.asyncio
+async def test_concurrent_fetch_claims_each_task_once():
+    with tempfile.NamedTemporaryFile(delete=True) as tmp:
+        qm = QueueManager(tmp.name)
+        await qm.initialize()
+        await qm.add_tasks([f"https://example.com/c{i}" for i in range(6)])
+        tasks = await asyncio.gather(*(qm.fetch_next_task() for _ in range(8)))
+        await qm.close()
+        claimed = [t.id for t in tasks if t is not None]
+        assert len(claimed) == 6
+        assert len(set(claimed)) == 6
+        assert all(t.status == "processing" for t in tasks if t is not None)
+
+
+@pytest.mark.asyncio
+async def test_known_keys_survive_restart():
+    with tempfile.NamedTemporaryFile(delete=True) as tmp:
+        qm = QueueManager(tmp.name)
+        await qm.initialize()
+        task_id, _ = await qm.add_task("https://youtu.be/abcdefghijk")
+        await qm.close()
+        # A fresh manager rebuilds the filter from the stored tasks
+        qm = QueueManager(tmp.name)
+        await qm.initialize()
+        is_dup, existing = await qm.check_duplicate("https://www.youtube.com/watch?v=abcdefghijk")
+        assert is_dup and existing.id == task_id
+        assert await qm.check_duplicate("https://example.com/never-seen") == (False, None)
+        await qm.close()
+
+
+@pytest.mark.asyncio
+async def test_read_pool_is_read_only():
+    with tempfile.NamedTemporaryFile(delete=True) as tmp:
+        qm = QueueManager(tmp.name)
+        await qm.initialize()
+        await qm.add_task("https://example.com/ro")
+        assert await qm.count_by_status("pending") == 1
+        async with qm._read() as conn:
+            with pytest.raises(sqlite3.OperationalError):
+                await conn.execute("DELETE FROM tasks")
+        await qm.close()
+
+
+@pytest.mark.asyncio
+async def test_close_refuses_new_borrows_and_closes_borrowed_connections():
+    with tempfile.NamedTemporaryFile(delete=True) as tmp:
+        qm = QueueManager(tmp.name)
+        await qm.initialize()
+        async with qm._connect() as conn:
+            await qm.close()
+            # A borrowed connection stays usable until it is returned
+            await conn.execute("SELECT 1")
+        assert qm._pool._connections == []
+        with pytest.raises(RuntimeError):
+            await qm.add_task("https://example.com/after-close")
+
+
+@pytest.mark.asyncio
+async def test_interleaved_batches_do_not_duplicate(monkeypatch):
+    real_commit = aiosqlite.Connection.commit
+
+    async def slow_commit(self):
+        await real_commit(self)
+        # Give the other batch the write lock before this one resumes
+        await asyncio.sleep(0.05)
+
+    monkeypatch.setattr(aiosqlite.Connection, "commit", slow_commit)
+    with tempfile.NamedTemporaryFile(delete=True) as tmp:
+        qm = QueueManager(tmp.name)
+        await qm.initialize()
+        url = "https://example.com/interleaved"
+        first, second = await asyncio.gather(
+            qm.add_tasks([url, "https://example.com/a"]),
+            qm.add_tasks(["https://example.com/b", url]),
+        )
+        assert await qm.count_by_status("pending") == 3
+        assert sorted([first[0][1], second[1][1]]) == [False, True]
+        assert first[0][0] == second[1][0]
+        await qm.close()
+
+
+@pytest.mark.asyncio
+async def test_pool_recovers_from_failed_rollback(monkeypatch):
+    with tempfile.NamedTemporaryFile(delete=True) as tmp:
+        qm = QueueManager(tmp.name)
+        pool = qm._pool
+        pool.size = 1
+
+        async def failing_rollback(self):
+            raise sqlite3.OperationalError("disk I/O error")
+
+        with monkeypatch.context() as patch:
+            patch.setattr(aiosqlite.Connection, "rollback", failing_rollback)
+            with pytest.raises(sqlite3.OperationalError):
+                async with pool.connection() as conn:
+                    await conn.execute("BEGIN")
+        # The broken connection gave its slot back, so the next borrow opens a new one
+        async with pool.connection() as conn:
+            await conn.execute("SELECT 1")
+        assert pool._opened == 1
+        await qm.close()
+
+
+@pytest.mark.asyncio
+async def test_close_wakes_waiting_borrowers():
+    with tempfile.NamedTemporaryFile(delete=True) as tmp:
+        qm = QueueManager(tmp.name)
+        pool = qm._pool
+        pool.size = 1
+        async with pool.connection():
+            waiter = asyncio.create_task(pool.connection().__aenter__())
+            await asyncio.sleep(0.01)
+            await qm.close()
+            with pytest.raises(RuntimeError):
+                await asyncio.wait_for(waiter, timeout=1)
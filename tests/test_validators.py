@@ -0,0 +1,66 @@
+"""Unit tests for the URL validation helpers."""
+
+from __future__ import annotations
+
+from autodl_enhanced.src.utils import validators
+
+
+def test_extract_urls_orders_and_dedupes():
+    text = (
+        "magnet:?xt=urn:btih:abc&tr=http://tracker.example/announce "
+        "https://a.example/x https://a.example/x http://b.example"
+    )
+    assert validators.extract_urls(text) == [
+        "https://a.example/x",
+        "http://b.example",
+        "magnet:?xt=urn:btih:abc&tr=http://tracker.example/announce",
+    ]
+
+
+def test_extract_urls_without_links():
+    assert validators.extract_urls("") == []
+    assert validators.extract_urls("no links here") == []
+
+
+def test_sanitize_url_strips_control_characters():
+    assert validators.sanitize_url(" https://a.example/\r\n\tx\x00y\x7f ") == "https://a.example/xy"
+    assert validators.sanitize_url("https://a.example/?a=1&amp;b=2") == "https://a.example/?a=1&b=2"
+    assert validators.sanitize_url("javascript:alert(1)") == ""
+
+
+def test_extract_urls_is_case_insensitive():
+    assert validators.extract_urls("HTTPS://A.example/x MAGNET:?xt=1") == ["HTTPS://A.example/x", "MAGNET:?xt=1"]
+
+
+def test_is_valid_url_fast_path_matches_urlparse():
+    from urllib.parse import urlparse
+
+    def reference(url: str) -> bool:
+        parsed = urlparse(url)
+        if parsed.scheme in {"http", "https"}:
+            return bool(parsed.netloc) and len(parsed.netloc) <= 253
+        return parsed.scheme == "magnet" and bool(parsed.query)
+
+    urls = [
+        "https://a.example/x?y=1#z",
+        "http://a.example",
+        "http://a.example?q",
+        "http://user:pw@a.example:8080#frag",
+        "http:///path",
+        "https://",
+        "https://" + "a" * 254,
+        "https://" + "a" * 253 + "/x",
+        "https://[::1]/x",
+        "https://\ta.example/",
+        "https://bücher.example/",
+        "HTTP://A.EXAMPLE/",
+        "magnet:?xt=urn:btih:abc",
+        "magnet:",
+        "ftp://a.example/",
+    ]
+    for url in urls:
+        assert validators.is_valid_url(url) == reference(url), url
+
+
+def test_sanitize_url_keeps_non_ascii_text():
+    assert validators.sanitize_url("https://bücher.example/\tпуть\n/😀") == "https://bücher.example/путь/😀"